@@ -0,0 +1,337 @@
+"""
+Local fakes of the Sarvam batch speech-to-text API and of the Azure Data Lake (DFS/blob) storage it hands out,
+so SarvamBatchTranscriber can be benchmarked without spending API credit.
+
+    python benchmarks/fake_sarvam.py [--latency 0.05] [--queue-seconds 1] [--processing-seconds 2] [--error-rate 0.01]
+
+FakeSarvamAPI serves job/init, job (start) and job/{job_id}/status. init returns storage URLs on FakeStorage,
+which implements the few DFS and blob calls the transcriber makes through the Azure SDK (create, append,
+flush, list paths and ranged reads). A started job turns Running after queue_s and Completed after
+processing_s more (plus per_file_s for every input file), at which point one {file_id}.json result per
+input is written to its output directory.
+
+Both fakes take a latency added to every request and an error_rate of requests answered with a 503.
+The job API can also fail whole jobs (job_failure_rate). Transient storage errors are retried by the
+Azure SDK after its own backoff (15 s by default), just as they would be against real storage.
+"""
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import json
+import random
+import time
+import uuid
+from aiohttp import web
+
+FILE_SYSTEM = "sarvam-jobs"
+SAS_TOKEN = "sv=2025-01-05&sig=fake"
+
+
+def _http_date(timestamp=None):
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+class _Faults:
+    """Latency and random failures applied to every request of a fake."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=503, text="Injected failure",
+                                headers={"x-ms-error-code": "ServerBusy", "Retry-After": "1"})
+        return await handler(request)
+
+
+class _StoredFile:
+    def __init__(self):
+        self.data = bytearray()
+        self.staged = {}
+        self.etag = None
+        self.last_modified = None
+        self.touch()
+
+    def touch(self):
+        self.etag = f'"0x{uuid.uuid4().hex[:16].upper()}"'
+        self.last_modified = time.time()
+
+    def flush(self, position):
+        """Commit the appended blocks up to position, as a DFS flush does. Returns False if a block is missing."""
+        data = bytearray()
+        while len(data) < position:
+            block = self.staged.get(len(data))
+            if block is None:
+                return False
+            data += block
+        self.data = data[:position]
+        self.staged.clear()
+        self.touch()
+        return True
+
+
+class FakeStorage:
+    """In-memory Data Lake storage answering the DFS and blob REST calls of azure-storage-file-datalake."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.faults = _Faults(latency, error_rate, seed)
+        # (file system, path) -> _StoredFile
+        self.files = {}
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.requests = 0
+        self.url = None
+
+    def reset_counters(self):
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.requests = 0
+
+    def put(self, file_system, path, data):
+        stored = self.files[(file_system, path)] = _StoredFile()
+        stored.data = bytearray(data)
+        return stored
+
+    def list(self, file_system, directory):
+        prefix = directory.strip("/") + "/"
+        return sorted(path for fs, path in self.files if fs == file_system and path.startswith(prefix))
+
+    def app(self):
+        app = web.Application(middlewares=[self._count, self.faults.middleware], client_max_size=1024**3)
+        app.router.add_route("*", "/{file_system}", self._file_system)
+        app.router.add_route("*", "/{file_system}/{path:.+}", self._path)
+        return app
+
+    @web.middleware
+    async def _count(self, request, handler):
+        self.requests += 1
+        response = await handler(request)
+        client_request_id = request.headers.get("x-ms-client-request-id")
+        if client_request_id:
+            response.headers["x-ms-client-request-id"] = client_request_id
+        response.headers["x-ms-request-id"] = str(uuid.uuid4())
+        response.headers["x-ms-version"] = request.headers.get("x-ms-version", "2025-01-05")
+        return response
+
+    def _properties(self, stored):
+        return {"ETag": stored.etag, "Last-Modified": _http_date(stored.last_modified)}
+
+    async def _file_system(self, request):
+        file_system = request.match_info["file_system"]
+        if request.method != "GET" or request.query.get("resource") != "filesystem":
+            return web.Response(status=400, text="Unsupported file system operation")
+        paths = [{"name": path, "isDirectory": "false", "contentLength": str(len(self.files[(file_system, path)].data)),
+                  "etag": self.files[(file_system, path)].etag,
+                  "lastModified": _http_date(self.files[(file_system, path)].last_modified)}
+                 for path in self.list(file_system, request.query.get("directory", ""))]
+        return web.json_response({"paths": paths})
+
+    async def _path(self, request):
+        key = (request.match_info["file_system"], request.match_info["path"])
+        query = request.query
+        if request.method == "PUT" and query.get("resource") == "file":
+            if request.headers.get("If-None-Match") == "*" and key in self.files:
+                return web.Response(status=409, headers={"x-ms-error-code": "PathAlreadyExists"})
+            stored = self.files[key] = _StoredFile()
+            return web.Response(status=201, headers={**self._properties(stored), "Content-Length": "0"})
+
+        stored = self.files.get(key)
+        if stored is None:
+            return web.Response(status=404, headers={"x-ms-error-code": "PathNotFound"})
+
+        if request.method == "PATCH" and query.get("action") == "append":
+            block = await request.read()
+            self.bytes_received += len(block)
+            stored.staged[int(query["position"])] = block
+            return web.Response(status=202, headers={"Content-Length": "0"})
+
+        if request.method == "PATCH" and query.get("action") == "flush":
+            if_match = request.headers.get("If-Match")
+            if if_match and if_match != stored.etag:
+                return web.Response(status=412, headers={"x-ms-error-code": "ConditionNotMet"})
+            if not stored.flush(int(query["position"])):
+                return web.Response(status=400, headers={"x-ms-error-code": "InvalidFlushPosition"})
+            return web.Response(status=200, headers={**self._properties(stored), "Content-Length": "0"})
+
+        if request.method in ("GET", "HEAD"):
+            return self._read(request, stored)
+        return web.Response(status=400, text="Unsupported path operation")
+
+    def _read(self, request, stored):
+        size = len(stored.data)
+        headers = {**self._properties(stored), "x-ms-blob-type": "BlockBlob", "Content-Type": "application/octet-stream",
+                   "Accept-Ranges": "bytes"}
+        byte_range = request.headers.get("x-ms-range") or request.headers.get("Range")
+        if request.method == "HEAD" or not byte_range:
+            body = b"" if request.method == "HEAD" else bytes(stored.data)
+            self.bytes_sent += len(body)
+            return web.Response(status=200, body=body, headers={**headers, "Content-Length": str(size)})
+        start, _, end = byte_range.split("=", 1)[1].partition("-")
+        start = int(start)
+        end = min(int(end) if end else size - 1, size - 1)
+        if start >= size:
+            return web.Response(status=416, headers={"x-ms-error-code": "InvalidRange", "Content-Range": f"bytes */{size}"})
+        body = bytes(stored.data[start:end + 1])
+        self.bytes_sent += len(body)
+        return web.Response(status=206, body=body, headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"})
+
+
+class FakeSarvamAPI:
+    """The Sarvam batch job API (init, start, status) backed by a FakeStorage."""
+
+    def __init__(self, storage, latency=0.0, error_rate=0.0, queue_s=1.0, processing_s=2.0, per_file_s=0.0,
+                 job_failure_rate=0.0, seed=None):
+        self.storage = storage
+        self.faults = _Faults(latency, error_rate, seed)
+        self.queue_s = queue_s
+        self.processing_s = processing_s
+        self.per_file_s = per_file_s
+        self.job_failure_rate = job_failure_rate
+        self._random = random.Random(seed)
+        self.jobs = {}
+        self.requests = 0
+        self.url = None
+
+    def app(self):
+        app = web.Application(middlewares=[self._count, self.faults.middleware])
+        app.router.add_post("/speech-to-text/job/init", self._init)
+        app.router.add_post("/speech-to-text/job", self._start)
+        app.router.add_get("/speech-to-text/job/{job_id}/status", self._status)
+        return app
+
+    @web.middleware
+    async def _count(self, request, handler):
+        self.requests += 1
+        if not request.headers.get("API-Subscription-Key"):
+            return web.json_response({"error": {"message": "Missing API-Subscription-Key"}}, status=403)
+        return await handler(request)
+
+    def _storage_url(self, job_id, name):
+        return f"{self.storage.url}/{FILE_SYSTEM}/{job_id}/{name}?{SAS_TOKEN}"
+
+    async def _init(self, request):
+        job_id = str(uuid.uuid4())
+        self.jobs[job_id] = {"state": "Accepted", "started": None, "inputs": [], "details": []}
+        return web.json_response({"job_id": job_id, "input_storage_path": self._storage_url(job_id, "input"),
+                                  "output_storage_path": self._storage_url(job_id, "output")}, status=202)
+
+    async def _start(self, request):
+        body = await request.json()
+        job = self.jobs.get(body.get("job_id"))
+        if job is None:
+            return web.json_response({"error": {"message": "Unknown job"}}, status=404)
+        if job["started"] is None:
+            job["started"] = time.monotonic()
+            job["inputs"] = self.storage.list(FILE_SYSTEM, f"{body['job_id']}/input")
+            job["fails"] = self._random.random() < self.job_failure_rate
+        return web.json_response({"job_id": body["job_id"], "job_state": job["state"]})
+
+    def _advance(self, job_id, job):
+        if job["started"] is None or job["state"] in ("Completed", "Failed"):
+            return
+        elapsed = time.monotonic() - job["started"]
+        done_after = self.queue_s + self.processing_s + self.per_file_s * len(job["inputs"])
+        if elapsed < self.queue_s:
+            return
+        if elapsed < done_after:
+            job["state"] = "Running"
+            return
+        if job["fails"]:
+            job["state"] = "Failed"
+            return
+        for file_id, path in enumerate(job["inputs"]):
+            file_name = path.rsplit("/", 1)[-1]
+            result = _fake_result(file_name, len(self.storage.files[(FILE_SYSTEM, path)].data))
+            self.storage.put(FILE_SYSTEM, f"{job_id}/output/{file_id}.json", json.dumps(result, ensure_ascii=False).encode("utf-8"))
+            job["details"].append({"file_id": file_id, "file_name": file_name, "status": "Success"})
+        job["state"] = "Completed"
+
+    async def _status(self, request):
+        job_id = request.match_info["job_id"]
+        job = self.jobs.get(job_id)
+        if job is None:
+            return web.json_response({"error": {"message": "Unknown job"}}, status=404)
+        self._advance(job_id, job)
+        return web.json_response({"job_id": job_id, "job_state": job["state"], "job_details": job["details"]})
+
+
+def _fake_result(file_name, size):
+    """A timestamped result with about one three-word phrase per 2 KB of uploaded audio (~1 s of 16 kbit/s Opus)."""
+    seed = int(hashlib.sha256(file_name.encode("utf-8")).hexdigest()[:8], 16)
+    words, starts, ends = [], [], []
+    for i in range(max(1, size // 2048)):
+        words.append(f"નમૂના વાક્ય {seed % 997 + i}")
+        starts.append(float(i))
+        ends.append(i + 0.8)
+    return {"transcript": " ".join(words), "language_code": "gu-IN",
+            "timestamps": {"words": words, "start_time_seconds": starts, "end_time_seconds": ends}}
+
+
+async def start_fakes(host="127.0.0.1", storage_options=None, api_options=None):
+    """Start FakeStorage and FakeSarvamAPI on free ports. Returns (storage, api, runners); clean up the runners when done."""
+    storage = FakeStorage(**(storage_options or {}))
+    api = FakeSarvamAPI(storage, **(api_options or {}))
+    runners = []
+    for fake in (storage, api):
+        runner = web.AppRunner(fake.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        fake.url = f"http://{host}:{port}"
+        runners.append(runner)
+    return storage, api, runners
+
+
+def add_fake_arguments(parser):
+    """Add the latency, timing and error-rate options of the fakes to parser."""
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every API request")
+    parser.add_argument("--storage-latency", type=float, default=0.005, help="Seconds added to every storage request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of API requests answered with a 503")
+    parser.add_argument("--storage-error-rate", type=float, default=0.0, help="Share of storage requests answered with a 503")
+    parser.add_argument("--job-failure-rate", type=float, default=0.0, help="Share of jobs that end in the Failed state")
+    parser.add_argument("--queue-seconds", type=float, default=0.5, help="Time a started job stays Accepted")
+    parser.add_argument("--processing-seconds", type=float, default=1.0, help="Time a job then stays Running")
+    parser.add_argument("--per-file-seconds", type=float, default=0.0, help="Extra processing time per input file")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the injected failures")
+
+
+def fake_options(args):
+    """Return the (storage_options, api_options) of start_fakes for arguments added by add_fake_arguments."""
+    storage_options = {"latency": args.storage_latency, "error_rate": args.storage_error_rate, "seed": args.seed}
+    api_options = {"latency": args.latency, "error_rate": args.error_rate, "queue_s": args.queue_seconds,
+                   "processing_s": args.processing_seconds, "per_file_s": args.per_file_seconds,
+                   "job_failure_rate": args.job_failure_rate, "seed": args.seed}
+    return storage_options, api_options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    add_fake_arguments(parser)
+    args = parser.parse_args(argv)
+
+    async def serve():
+        storage, api, runners = await start_fakes(args.host, *fake_options(args))
+        print(f"Fake Sarvam API: {api.url}  (SarvamBatchTranscriber(..., api_base_url={api.url!r}))")
+        print(f"Fake storage:    {storage.url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
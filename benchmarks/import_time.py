@@ -0,0 +1,84 @@
+"""
+Cold-start import time of the media_magic entry points.
+
+Every target is imported in a fresh interpreter with `python -X importtime`, so nothing is already
+loaded. The median total over --runs runs is reported with the slowest modules of the last run.
+
+    python benchmarks/import_time.py [--runs 5] [--top 10] [--budget-ms gui=500 --budget-ms headless=300]
+
+Exits with status 1 when a target exceeds its budget, so it can gate a build.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "gui": "media_magic.gui",
+    "headless": "media_magic.daemon",
+    "transcriber": "media_magic.transcriber",
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module):
+    """Import module in a new interpreter and return (total_us, [(cumulative_us, self_us, name)] of every import)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    imports = []
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        imports.append((cumulative_us, self_us, name))
+        # Top level imports are indented by a single space
+        if len(indent) == 1:
+            total += cumulative_us
+    return total, imports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules (by self time) to list per target")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="TARGET=MS",
+                        help="Fail when the median import time of TARGET exceeds MS milliseconds")
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), help=f"Any of {', '.join(TARGETS)}")
+    args = parser.parse_args(argv)
+    budgets = {target: float(ms) for target, ms in (item.split("=", 1) for item in args.budget_ms)}
+
+    over_budget = []
+    for target in args.targets:
+        module = TARGETS.get(target, target)
+        totals = []
+        for _ in range(args.runs):
+            total, imports = measure(module)
+            totals.append(total / 1000)
+        median = statistics.median(totals)
+        budget = budgets.get(target)
+        status = ""
+        if budget is not None:
+            status = f" (budget {budget:.0f} ms: {'OK' if median <= budget else 'OVER'})"
+            if median > budget:
+                over_budget.append(target)
+        print(f"{target:<12} import {module}: median {median:.0f} ms, min {min(totals):.0f} ms, max {max(totals):.0f} ms{status}")
+        for cumulative_us, self_us, name in sorted(imports, key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"    {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+End-to-end throughput of SarvamBatchTranscriber against the local fakes in fake_sarvam.py.
+
+Synthetic speech-like WAV fixtures (16 kHz mono tone bursts separated by pauses, different per file) are
+transcribed through transcribe_many for every batch size. Each size runs in a fresh interpreter with its
+own cache directory, so peak RSS and the transcript cache are per run. Reported per size: wall time,
+files per second, bytes uploaded to and downloaded from the fake storage, and the peak RSS of the
+transcriber process and of its ffmpeg children.
+
+    python benchmarks/transcriber_throughput.py [--sizes 1 10 100] [--seconds 20] [--files-per-job 20]
+        [--latency 0.02] [--processing-seconds 1] [--error-rate 0.01] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import wave
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_sarvam import add_fake_arguments, fake_options, start_fakes  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def write_fixture(path, seconds, seed):
+    """Write a 16-bit mono WAV of tone bursts (0.3-1.5 s, 120-300 Hz with harmonics) separated by 0.2-0.8 s pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    samples = np.zeros(total, dtype=np.float32)
+    position = 0
+    while position < total:
+        length = min(int(rng.uniform(0.3, 1.5) * SAMPLE_RATE), total - position)
+        t = np.arange(length) / SAMPLE_RATE
+        pitch = rng.uniform(120, 300)
+        burst = sum(np.sin(2 * np.pi * pitch * harmonic * t) / harmonic for harmonic in (1, 2, 3))
+        envelope = np.minimum(1.0, np.minimum(t, t[::-1]) * 20)
+        samples[position:position + length] = 0.3 * burst * envelope
+        position += length + int(rng.uniform(0.2, 0.8) * SAMPLE_RATE)
+    samples += rng.normal(0, 0.003, total).astype(np.float32)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def make_fixtures(directory, count, seconds):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"fixture_{i:03d}.wav")
+        if not os.path.exists(path):
+            write_fixture(path, seconds, seed=i)
+        paths.append(path)
+    return paths
+
+
+def _peak_rss_bytes(who):
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_worker(config):
+    """Transcribe config["files"] in this process and print one JSON line with the outcome."""
+    from media_magic.polling import JobStatusPoller
+    from media_magic.transcriber import SarvamBatchTranscriber
+    # The Azure SDK logs every storage request and response at INFO
+    logging.getLogger("azure").setLevel(logging.WARNING)
+
+    async def run():
+        transcriber = SarvamBatchTranscriber("benchmark", language_code="gu-IN", api_base_url=config["api_url"],
+                                             upload_profile=config["upload_profile"])
+        transcriber.poller = JobStatusPoller(transcriber.check_job_status, min_interval=config["poll_interval"],
+                                             base_processing_s=config["expected_job_s"], speed_ratio=0.0)
+        states = {}
+        async with transcriber:
+            async for result in transcriber.transcribe_many(config["files"], config["output_dir"],
+                                                            files_per_job=config["files_per_job"],
+                                                            max_concurrent_jobs=config["max_concurrent_jobs"]):
+                states[result["job_state"]] = states.get(result["job_state"], 0) + len(result["local_files"])
+        return states
+
+    started = time.perf_counter()
+    states = asyncio.run(run())
+    print(json.dumps({"wall_s": time.perf_counter() - started, "states": states,
+                      "peak_rss": _peak_rss_bytes(resource.RUSAGE_SELF),
+                      "children_peak_rss": _peak_rss_bytes(resource.RUSAGE_CHILDREN)}))
+
+
+async def run_size(args, storage, api, files, work_dir):
+    """Run one batch size in a fresh interpreter and return its measurements."""
+    storage.reset_counters()
+    api.requests = 0
+    output_dir = tempfile.mkdtemp(prefix=f"out{len(files)}_", dir=work_dir)
+    config = {"api_url": api.url, "files": files, "output_dir": output_dir, "upload_profile": args.upload_profile,
+              "files_per_job": args.files_per_job, "max_concurrent_jobs": args.max_concurrent_jobs,
+              "poll_interval": args.poll_interval, "expected_job_s": args.queue_seconds + args.processing_seconds}
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])),
+           "MEDIA_MAGIC_CACHE_DIR": tempfile.mkdtemp(prefix="cache_", dir=work_dir),
+           "MEDIA_MAGIC_LOG_LEVEL": args.log_level}
+    process = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config),
+                                                   cwd=work_dir, env=env, stdout=asyncio.subprocess.PIPE)
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark worker for {len(files)} files exited with status {process.returncode}")
+    measured = json.loads(stdout.decode().strip().splitlines()[-1])
+    return {"files": len(files), "input_bytes": sum(os.path.getsize(path) for path in files),
+            "uploaded_bytes": storage.bytes_received, "downloaded_bytes": storage.bytes_sent,
+            "api_requests": api.requests, "storage_requests": storage.requests, **measured}
+
+
+def _mb(size):
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def main(argv=None):
+    if argv is None and len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        run_worker(json.loads(sys.argv[2]))
+        return 0
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100], help="Numbers of files to transcribe")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Duration of every fixture")
+    parser.add_argument("--files-per-job", type=int, default=20)
+    parser.add_argument("--max-concurrent-jobs", type=int, default=4)
+    parser.add_argument("--upload-profile", default="opus", help="Upload profile of the transcriber (opus, flac)")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Minimum job status polling interval")
+    parser.add_argument("--fixtures-dir", help="Keep the generated fixtures here (default: a temporary directory)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the transcriber process")
+    parser.add_argument("--json", help="Also write the results to this file")
+    add_fake_arguments(parser)
+    args = parser.parse_args(argv)
+
+    async def run():
+        results = []
+        storage, api, runners = await start_fakes("127.0.0.1", *fake_options(args))
+        try:
+            with tempfile.TemporaryDirectory(prefix="media_magic_bench_") as work_dir:
+                fixtures_dir = args.fixtures_dir or os.path.join(work_dir, "fixtures")
+                os.makedirs(fixtures_dir, exist_ok=True)
+                fixtures = await asyncio.to_thread(make_fixtures, fixtures_dir, max(args.sizes), args.seconds)
+                for size in args.sizes:
+                    result = await run_size(args, storage, api, fixtures[:size], work_dir)
+                    results.append(result)
+                    print(f"{size:>5} files: {result['wall_s']:7.2f} s wall, {size / result['wall_s']:6.2f} files/s, "
+                          f"in {_mb(result['input_bytes'])}, up {_mb(result['uploaded_bytes'])}, "
+                          f"down {_mb(result['downloaded_bytes'])}, peak RSS {_mb(result['peak_rss'])} "
+                          f"(ffmpeg {_mb(result['children_peak_rss'])}), {result['api_requests']} API / "
+                          f"{result['storage_requests']} storage requests, jobs {result['states']}", flush=True)
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+        return results
+
+    results = asyncio.run(run())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import os
 from .logger import logger
-from moviepy import editor
 
 def is_audio_file(filepath):
     audio_exts = ['.mp3', '.wav', '.aac', '.flac', '.ogg', '.m4a']
@@ -8,11 +7,13 @@ def is_audio_file(filepath):
 
 def get_audio_duration(filepath):
     """Return duration of audio file in seconds. Returns 0 if file is invalid or unreadable."""
+    from .probe import get_audio_info
     try:
-        audio = editor.AudioFileClip(filepath)
-        duration = int(audio.duration)
-        audio.close()
-        return duration
+        duration = get_audio_info(filepath)["duration"]
+        if duration is None:
+            logger.error(f"Failed to get duration for {filepath}")
+            return 0
+        return int(duration)
     except Exception as e:
         logger.exception(f"Failed to get duration for {filepath}")
     return 0 
@@ -20,4 +21,14 @@ def get_audio_duration(filepath):
 def create_if_not_exists(directory):
     if not os.path.isdir(directory):
         os.mkdir(directory)
-        logger.info(f"{directory} was absent. Created the missing directory.") 
\ No newline at end of file
+        logger.info(f"{directory} was absent. Created the missing directory.") 
+
+def get_cache_dir(*parts):
+    """
+    Return (and create) a directory under the media_magic cache root, which is
+    MEDIA_MAGIC_CACHE_DIR if set, else ~/.media_magic.
+    """
+    root = os.getenv('MEDIA_MAGIC_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.media_magic')
+    directory = os.path.join(root, *parts)
+    os.makedirs(directory, exist_ok=True)
+    return directory
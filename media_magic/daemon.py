@@ -0,0 +1,254 @@
+"""
+Headless watch-folder service: transcribes audio files as they land in an input directory.
+
+    python -m media_magic.daemon INPUT_DIR OUTPUT_DIR [--files-per-job 20] [--max-concurrent-jobs 4]
+
+New files are picked up through inotify (Linux), so an idle daemon costs nothing. Files that arrive
+within --settle-seconds of each other are batched into Sarvam jobs of up to --files-per-job files,
+and at most --max-concurrent-jobs jobs run at once. Transcripts are written to OUTPUT_DIR and every
+input is then moved to the processed (or failed) directory. Jobs interrupted by a restart are resumed
+from their journals. This module must not import the GUI (Tk) so it can run on servers.
+"""
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import shutil
+import signal
+import struct
+from .audio_utils import is_audio_file, get_cache_dir
+from .journal import JobJournal
+from .logger import logger
+from .metrics import metrics
+from .transcriber import SarvamBatchTranscriber
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Non-blocking inotify watch on one directory, reporting files that were closed after writing or moved in.
+    fileno() can be registered with an event loop; read_names() returns the file names of the queued events,
+    or None when the kernel queue overflowed and the directory has to be rescanned.
+    """
+
+    def __init__(self, directory, mask=IN_CLOSE_WRITE | IN_MOVED_TO):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+        if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+
+    def fileno(self):
+        return self._fd
+
+    def read_names(self):
+        names = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif name:
+                    names.append(os.fsdecode(name))
+        return None if overflow else names
+
+    def close(self):
+        os.close(self._fd)
+
+
+class WatchFolderDaemon:
+    """Feeds the audio files arriving in input_dir to batch transcription jobs, with bounded concurrency."""
+
+    def __init__(self, transcriber, input_dir, output_dir, processed_dir=None, failed_dir=None, settle_s=5.0,
+                 files_per_job=20, max_concurrent_jobs=4, chunk_duration_ms=60*60*1000, metrics_file=None):
+        self.transcriber = transcriber
+        self.input_dir = os.path.abspath(input_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.processed_dir = os.path.abspath(processed_dir or os.path.join(input_dir, "processed"))
+        self.failed_dir = os.path.abspath(failed_dir or os.path.join(input_dir, "failed"))
+        self.settle_s = settle_s
+        self.files_per_job = files_per_job
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.chunk_duration_ms = chunk_duration_ms
+        # Metrics are rewritten here after every job: Prometheus text, or JSON for a .json path
+        self.metrics_file = metrics_file
+        # Files queued for the next batch, and files owned by a running (or resumable) job
+        self._pending = []
+        self._claimed = set()
+        self._tasks = set()
+
+    def _add(self, path):
+        path = os.path.abspath(path)
+        if path in self._claimed or not os.path.isfile(path) or not is_audio_file(path):
+            return
+        if os.path.basename(path).startswith("."):
+            return
+        self._claimed.add(path)
+        self._pending.append(path)
+        self._arrived.set()
+
+    def _scan(self):
+        for name in sorted(os.listdir(self.input_dir)):
+            self._add(os.path.join(self.input_dir, name))
+
+    def _on_readable(self):
+        names = self._watcher.read_names()
+        if names is None:
+            logger.warning("inotify queue overflowed; rescanning the input directory")
+            self._scan()
+            return
+        for name in names:
+            self._add(os.path.join(self.input_dir, name))
+
+    def _start(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _finish(self, local_files, result):
+        if result.get("journal"):
+            # Resumable (e.g. timed out): leave the inputs where the journal expects them
+            logger.warning(f"Job {result['job_id']} ended in state {result['job_state']}; it will be resumed on restart")
+            return
+        completed = result["job_state"] == "Completed"
+        target_dir = self.processed_dir if completed else self.failed_dir
+        for path in local_files:
+            try:
+                os.replace(path, os.path.join(target_dir, os.path.basename(path)))
+            except OSError as e:
+                logger.error(f"Failed to move {path} to {target_dir}: {e}")
+            self._claimed.discard(path)
+        logger.info(f"Job {result['job_id']} {'completed' if completed else 'failed'} for {len(local_files)} files; "
+                    f"transcripts: {result.get('transcripts')}, upload stats: {result.get('upload_stats')}")
+        self._write_metrics()
+
+    def _write_metrics(self):
+        if not self.metrics_file:
+            return
+        try:
+            metrics.write(self.metrics_file)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics to {self.metrics_file}: {e}")
+
+    async def _run_job(self, local_files):
+        async with self._semaphore:
+            logger.info(f"Starting job for {len(local_files)} files")
+            result = await self.transcriber.transcribe_batch_isolated(local_files, self.output_dir, self.chunk_duration_ms)
+        self._finish(local_files, result)
+
+    async def _resume_job(self, journal):
+        async with self._semaphore:
+            try:
+                result = await self.transcriber.resume_job(journal.path)
+            except Exception as e:
+                # Give up on the job rather than failing again on every restart
+                logger.error(f"Resuming job journal {journal.path} failed: {e}; giving up on it")
+                journal.remove()
+                if journal.state.get("publish_dir"):
+                    shutil.rmtree(journal.state["destination_dir"], ignore_errors=True)
+                result = {"job_id": journal.state["job_id"], "job_state": "Failed", "journal": None}
+        self._finish(journal.state["local_files"], result)
+
+    async def run(self):
+        """Watch input_dir until cancelled or stop() is called."""
+        for directory in (self.input_dir, self.output_dir, self.processed_dir, self.failed_dir):
+            os.makedirs(directory, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        self._arrived = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        self._watcher = InotifyWatcher(self.input_dir)
+        loop.add_reader(self._watcher.fileno(), self._on_readable)
+        logger.info(f"Watching {self.input_dir} for audio files; transcripts go to {self.output_dir}")
+        try:
+            for journal in JobJournal.list_pending(self.transcriber.journal_dir):
+                self._claimed.update(journal.state["local_files"])
+                self._start(self._resume_job(journal))
+            self._scan()
+            while not self._stopped.is_set():
+                arrived = asyncio.create_task(self._arrived.wait())
+                stopped = asyncio.create_task(self._stopped.wait())
+                await asyncio.wait([arrived, stopped], return_when=asyncio.FIRST_COMPLETED)
+                arrived.cancel()
+                stopped.cancel()
+                if self._stopped.is_set():
+                    break
+                # Let a burst of arrivals settle so they share jobs
+                await asyncio.sleep(self.settle_s)
+                self._arrived.clear()
+                batch, self._pending = self._pending, []
+                for i in range(0, len(batch), self.files_per_job):
+                    self._start(self._run_job(batch[i:i + self.files_per_job]))
+        finally:
+            loop.remove_reader(self._watcher.fileno())
+            self._watcher.close()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self.transcriber.close()
+            self._write_metrics()
+            logger.info("Watch-folder daemon stopped")
+
+    def stop(self):
+        self._stopped.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m media_magic.daemon",
+                                     description="Transcribe audio files dropped into a directory.")
+    parser.add_argument("input_dir", help="Directory to watch for new audio files")
+    parser.add_argument("output_dir", help="Directory the transcripts are written to")
+    parser.add_argument("--processed-dir", help="Where inputs are moved once transcribed (default: INPUT_DIR/processed)")
+    parser.add_argument("--failed-dir", help="Where inputs of failed jobs are moved (default: INPUT_DIR/failed)")
+    parser.add_argument("--language-code", default="gu-IN", help="Language of the audio")
+    parser.add_argument("--files-per-job", type=int, default=20, help="Maximum number of files per batch job")
+    parser.add_argument("--max-concurrent-jobs", type=int, default=4, help="Maximum number of batch jobs running at once")
+    parser.add_argument("--settle-seconds", type=float, default=5.0, help="How long to wait for more arrivals before starting jobs")
+    parser.add_argument("--upload-profile", default="opus", choices=["flac", "opus", "source"],
+                        help="Encoding of the audio uploaded to Sarvam (16 kHz mono), or the source audio as-is")
+    parser.add_argument("--metrics-file", help="Write metrics here after every job (.json for JSON, else Prometheus text)")
+    parser.add_argument("--journal-dir", help="Directory for the job journals (default: the media_magic cache, jobs/daemon)")
+    args = parser.parse_args(argv)
+
+    api_key = os.getenv("SARVAM_API_KEY")
+    if not api_key:
+        parser.error("SARVAM_API_KEY not set in environment")
+    transcriber = SarvamBatchTranscriber(api_key, language_code=args.language_code,
+                                         journal_dir=args.journal_dir or get_cache_dir("jobs", "daemon"),
+                                         upload_profile=None if args.upload_profile == "source" else args.upload_profile)
+    daemon = WatchFolderDaemon(transcriber, args.input_dir, args.output_dir, args.processed_dir, args.failed_dir,
+                               settle_s=args.settle_seconds, files_per_job=args.files_per_job,
+                               max_concurrent_jobs=args.max_concurrent_jobs, metrics_file=args.metrics_file)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, daemon.stop)
+        await daemon.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
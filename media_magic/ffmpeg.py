@@ -0,0 +1,46 @@
+import subprocess
+import sys
+from .logger import logger
+
+
+def get_ffmpeg_exe():
+    """Return the ffmpeg binary bundled with imageio-ffmpeg (the same one moviepy uses)."""
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def run_ffmpeg(args, check=True, input=None):
+    """
+    Run ffmpeg with args without opening a console window on Windows, feeding it input (bytes) on stdin if given.
+    Returns the CompletedProcess.
+    """
+    cmd = [get_ffmpeg_exe(), "-hide_banner"] + ([] if input is not None else ["-nostdin"]) + list(args)
+    logger.debug(f"Running: {' '.join(cmd)}")
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    result = subprocess.run(cmd, input=input, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({result.returncode}): {result.stderr.decode(errors='replace').strip()}")
+    return result
+
+
+def iter_ffmpeg_output(args, block_size=1024*1024):
+    """Run ffmpeg with args and yield its stdout in blocks of up to block_size bytes without buffering all of it."""
+    cmd = [get_ffmpeg_exe(), "-hide_banner", "-nostdin"] + list(args)
+    logger.debug(f"Running: {' '.join(cmd)}")
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **kwargs)
+    try:
+        while True:
+            block = process.stdout.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({returncode})")
@@ -2,26 +2,38 @@ from ttkbootstrap import Style
 from ttkbootstrap.constants import *
 import ttkbootstrap as ttkb
 from tkinter import ttk, filedialog, messagebox
-from .audio_utils import is_audio_file, get_audio_duration, create_if_not_exists
+from .audio_utils import is_audio_file, get_audio_duration, create_if_not_exists, get_cache_dir
 from .logger import logger
 import os
-from moviepy import editor
-from .transcriber import SarvamBatchTranscriber
+from .probe import get_audio_info
+from .segmenter import trim_audio
+from .youtube import download_audio
 import asyncio
 import threading
 
+# Encoding the transcriber uploads in. Trims are stream copied (a full encode runs well under 100x realtime) and
+# the audio is encoded once while the upload is prepared, in parallel chunks for long recordings
+UPLOAD_PROFILE = 'opus'
+# How often the UI picks up the latest progress reported by the worker threads
+PROGRESS_POLL_MS = 200
+
 class MediaMagicGUI:
     def __init__(self, root):
         self.root = root
+        # Latest (text, fraction) reported by a worker thread, and the one on screen
+        self._progress = ('', None)
+        self._shown_progress = None
         self._setup_window()
         self._setup_tabs()
         self._setup_audio_tab()
         self._setup_video_tab()
+        self._poll_progress()
+        self.root.after(0, self._offer_resume)
 
     def _setup_window(self):
         self.root.title('Media Magic')
-        self.root.geometry('500x300')
-        self.root.minsize(500, 300)
+        self.root.geometry('500x340')
+        self.root.minsize(500, 340)
         # Add a top label for visibility
         top_label = ttkb.Label(self.root, text='Media Magic!', font=('Arial', 14, 'bold'), bootstyle="primary")
         top_label.pack(pady=5)
@@ -49,6 +61,9 @@ class MediaMagicGUI:
         self.progress_var = ttkb.StringVar(value='')
         self.progress_label = ttkb.Label(self.audio_tab, textvariable=self.progress_var, bootstyle="warning")
         self.progress_label.pack(pady=5)
+        self.progress_value = ttkb.DoubleVar(value=0)
+        self.progress_bar = ttkb.Progressbar(self.audio_tab, variable=self.progress_value, maximum=100, bootstyle="warning-striped")
+        self.progress_bar.pack(fill='x', padx=20)
 
         # Start/End time widgets
         self.start_time_vars = [ttkb.IntVar(value=0) for _ in range(3)]  # hours, min, sec
@@ -131,6 +146,117 @@ class MediaMagicGUI:
         # Progress label for Video Magic
         self.video_progress_label = ttkb.Label(self.video_tab, textvariable=self.progress_var, bootstyle="warning")
         self.video_progress_label.pack(pady=5)
+        self.video_progress_bar = ttkb.Progressbar(self.video_tab, variable=self.progress_value, maximum=100, bootstyle="warning-striped")
+        self.video_progress_bar.pack(fill='x', padx=20)
+
+    def _set_progress(self, text, fraction=None):
+        """Report progress from any thread; fraction (0-1) moves the progress bar, None leaves it where it is."""
+        self._progress = (text, fraction)
+
+    def _poll_progress(self):
+        # The only place progress reaches Tk: however fast workers report, the UI updates at most every PROGRESS_POLL_MS
+        progress = self._progress
+        if progress is not self._shown_progress:
+            text, fraction = progress
+            self.progress_var.set(text)
+            if fraction is not None:
+                self.progress_value.set(fraction * 100)
+            self._shown_progress = progress
+        self.root.after(PROGRESS_POLL_MS, self._poll_progress)
+
+    def _transcription_progress(self, status):
+        # progress_callback of the transcriber: status strings and ProgressEvents (whose str() is a summary)
+        self._set_progress(f'Transcribing: {status}', getattr(status, 'fraction', None))
+
+    def _new_transcriber(self, api_key):
+        from .transcriber import SarvamBatchTranscriber
+        # The GUI keeps its job journals apart, so it only ever offers to resume its own runs
+        return SarvamBatchTranscriber(api_key, language_code='gu-IN', upload_profile=UPLOAD_PROFILE,
+                                      journal_dir=get_cache_dir('jobs', 'gui'))
+
+    def _remove_temp_inputs(self, journal):
+        """Delete the temp folder inputs and the upload chunks of the run of journal (never the user's own files)."""
+        temp_dir = os.path.join(os.path.abspath('temp'), '')
+        temp_inputs = [f for f in journal.state['local_files'] if f.startswith(temp_dir)]
+        for f in temp_inputs + journal.state['chunked_files']:
+            try:
+                if os.path.exists(f):
+                    os.remove(f)
+                    logger.info(f"Deleted temporary file: {f}")
+            except OSError as cleanup_err:
+                logger.error(f"Failed to delete temporary file {f}: {cleanup_err}")
+
+    def _offer_resume(self):
+        """On start, offer to resume (or discard) the transcriptions an earlier session left unfinished."""
+        from .journal import JobJournal
+        pending = JobJournal.list_pending(get_cache_dir('jobs', 'gui'))
+        if not pending:
+            return
+        answer = messagebox.askyesnocancel(
+            'Unfinished Transcriptions', f'{len(pending)} transcription(s) did not finish last time. Resume them now?\n\n'
+                                         f'Yes resumes them, No discards them, Cancel asks again next time.')
+        if answer is None:
+            return
+        if not answer:
+            for journal in pending:
+                self._remove_temp_inputs(journal)
+                journal.remove()
+            return
+        api_key = os.getenv('SARVAM_API_KEY')
+        if not api_key:
+            messagebox.showerror('API Key Error', 'SARVAM_API_KEY not set in environment.')
+            return
+        transcriber = self._new_transcriber(api_key)
+        self._set_progress('Resuming transcriptions...', 0.0)
+
+        async def do_resume():
+            results = []
+            try:
+                for journal in pending:
+                    try:
+                        result = await transcriber.resume_job(journal.path, progress_callback=self._transcription_progress)
+                    except Exception as e:
+                        # A journal that cannot be resumed would otherwise be offered again on every start
+                        logger.error(f'Resuming {journal.path} failed: {e!r}')
+                        journal.remove()
+                        result = {'job_id': journal.state['job_id'], 'job_state': 'Failed', 'journal': None}
+                    if not result['journal']:
+                        self._remove_temp_inputs(journal)
+                    results.append(result)
+            finally:
+                await transcriber.close()
+            if len(results) == 1:
+                self._report_transcription(results[0])
+                return
+            completed = sum(1 for result in results if result['job_state'] == 'Completed')
+            unfinished = sum(1 for result in results if result['job_state'] != 'Completed' and result['journal'])
+            failed = len(results) - completed - unfinished
+            self._set_progress(f'Resumed {len(results)} transcriptions: {completed} complete, {unfinished} unfinished, {failed} failed.',
+                               1.0 if completed == len(results) else None)
+            show = messagebox.showinfo if completed == len(results) else messagebox.showwarning
+            self.root.after(0, lambda: show('Resumed Transcriptions', f'{completed} of {len(results)} transcriptions are complete; '
+                                                                      f'{unfinished} did not finish yet and {failed} failed. '
+                                                                      f'Check the transcripts directory.'))
+        threading.Thread(target=lambda: asyncio.run(do_resume()), daemon=True).start()
+
+    def _report_transcription(self, result):
+        """Show the outcome of a transcribe_batch result. Returns True if the job can still be resumed, so its input must be kept."""
+        state = result['job_state'] or 'unknown'
+        if state == 'Completed':
+            self._set_progress('Done!', 1.0)
+            self.root.after(0, lambda: messagebox.showinfo('Transcription Complete', 'Transcription complete! Check the transcripts directory.'))
+            return False
+        if result['journal']:
+            logger.warning(f"Job {result['job_id']} ended in state {state}; its journal {result['journal']} can be resumed")
+            self._set_progress(f'Transcription not finished ({state}).')
+            self.root.after(0, lambda: messagebox.showwarning(
+                'Transcription Incomplete', f"The transcription job did not finish (state: {state}). Its progress is saved; "
+                                            f"Media Magic offers to resume it the next time it starts."))
+            return True
+        logger.error(f"Job {result['job_id']} ended in state {state}")
+        self._set_progress('Error during transcription.')
+        self.root.after(0, lambda: messagebox.showerror('Transcription Error', f'Transcription failed (job state: {state}).'))
+        return False
 
     def on_audio_file_selected(self, *args):
         if self.audio_file_path.get():
@@ -188,45 +314,43 @@ class MediaMagicGUI:
         # Create temp folder
         temp_dir = os.path.join(os.getcwd(), 'temp')
         create_if_not_exists(temp_dir)
-        # Trim audio
-        try:
-            self.progress_var.set('Trimming audio...')
-            audio = editor.AudioFileClip(audio_path)
-            trimmed = audio.subclip(start_sec, end_sec)
-            base_name = os.path.splitext(os.path.basename(audio_path))[0]
-            trimmed_path = os.path.join(temp_dir, f"{base_name}_trimmed_{start_sec}_{end_sec}.mp3")
-            trimmed.write_audiofile(trimmed_path, logger=None)
-            audio.close()
-        except Exception as e:
-            logger.error(f'Error trimming audio: {e}')
-            self.progress_var.set('Error during trimming.')
-            messagebox.showerror('Error', f'Failed to trim audio: {e}')
-            return
 
-        # Now transcribe using SarvamBatchTranscriber
+        # Trim (off the UI thread) and transcribe using SarvamBatchTranscriber
         def run_transcription():
             api_key = os.getenv('SARVAM_API_KEY')
             if not api_key:
                 self.root.after(0, lambda: messagebox.showerror('API Key Error', 'SARVAM_API_KEY not set in environment.'))
-                self.root.after(0, lambda: self.progress_var.set(''))
+                self._set_progress('')
                 return
-            transcriber = SarvamBatchTranscriber(api_key, language_code='gu-IN')
+            # Trim audio; a range covering the whole file is handed over as-is
+            try:
+                if start_sec == 0 and end_sec >= get_audio_duration(audio_path):
+                    trimmed_path = audio_path
+                else:
+                    self._set_progress('Trimming audio...', 0.0)
+                    trimmed_path = trim_audio(audio_path, start_sec, end_sec, temp_dir)
+            except Exception as e:
+                logger.error(f'Error trimming audio: {e}')
+                self._set_progress('Error during trimming.')
+                self.root.after(0, lambda e=e: messagebox.showerror('Error', f'Failed to trim audio: {e}'))
+                return
+            transcriber = self._new_transcriber(api_key)
             transcripts_dir = os.path.join(os.getcwd(), 'transcripts')
             os.makedirs(transcripts_dir, exist_ok=True)
-            def progress_callback(status):
-                self.root.after(0, lambda: self.progress_var.set(f'Transcribing: {status}'))
+            self._set_progress('Transcribing...', 0.0)
             async def do_transcribe():
+                resumable = False
                 try:
-                    await transcriber.transcribe_batch([trimmed_path], transcripts_dir, progress_callback=progress_callback)
-                    self.root.after(0, lambda: self.progress_var.set('Done!'))
-                    self.root.after(0, lambda: messagebox.showinfo('Transcription Complete', f'Transcription complete! Check the transcripts directory.'))
+                    result = await transcriber.transcribe_batch([trimmed_path], transcripts_dir, progress_callback=self._transcription_progress)
+                    resumable = self._report_transcription(result)
                 except Exception as e:
                     logger.error(f'Transcription failed: {e}')
-                    self.root.after(0, lambda: self.progress_var.set('Error during transcription.'))
+                    self._set_progress('Error during transcription.')
                     self.root.after(0, lambda: messagebox.showerror('Transcription Error', f'Transcription failed: {e}'))
                 finally:
+                    await transcriber.close()
                     try:
-                        if os.path.exists(trimmed_path):
+                        if not resumable and trimmed_path != audio_path and os.path.exists(trimmed_path):
                             os.remove(trimmed_path)
                             logger.info(f"Deleted temporary file: {trimmed_path}")
                     except Exception as cleanup_err:
@@ -252,37 +376,16 @@ class MediaMagicGUI:
             if not link:
                 self.root.after(0, lambda: messagebox.showerror('Missing Link', 'Please enter a YouTube link.'))
                 return
-            self.root.after(0, lambda: self.progress_var.set('Downloading video...'))
-            import tempfile
-            import shutil
-            from pytubefix import YouTube
+            self._set_progress('Downloading audio...', 0.0)
             import traceback
             temp_dir = os.path.join(os.getcwd(), 'temp')
             create_if_not_exists(temp_dir)
-            video_path = None
             audio_path = None
             trimmed_audio_path = None
             try:
-                # Download video
-                yt = YouTube(link, 'TV')
-                stream = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
-                if not stream:
-                    raise Exception('No suitable video stream found.')
-                video_path = stream.download(output_path=temp_dir)
-                # Check if file exists and is not empty
-                if not os.path.exists(video_path) or os.path.getsize(video_path) == 0:
-                    raise Exception('Downloaded video file is missing or empty.')
-                # Try to load video file
-                try:
-                    video_clip = editor.VideoFileClip(video_path)
-                except Exception as e:
-                    raise Exception(f'Failed to load video file: {e}')
-                self.root.after(0, lambda: self.progress_var.set('Converting to audio...'))
-                # Convert to audio
-                base_name = os.path.splitext(os.path.basename(video_path))[0]
-                audio_path = os.path.join(temp_dir, f"{base_name}.mp3")
-                video_clip.audio.write_audiofile(audio_path, logger=None)
-                video_clip.close()
+                # Download only the audio stream; it is transcribed as-is, without a video or an MP3 re-encode
+                audio_path = download_audio(link, temp_dir)
+                base_name = os.path.splitext(os.path.basename(audio_path))[0]
 
                 # Check for start/end enforcement
                 enforce_start = self.enforce_start_var.get()
@@ -295,50 +398,42 @@ class MediaMagicGUI:
                     end_sec = self.video_end_time_vars[0].get() * 3600 + self.video_end_time_vars[1].get() * 60 + self.video_end_time_vars[2].get()
                 # Only trim if either is enforced
                 if enforce_start or enforce_end:
-                    self.root.after(0, lambda: self.progress_var.set('Trimming audio...'))
-                    from moviepy.editor import AudioFileClip
-                    audio_clip = AudioFileClip(audio_path)
-                    duration = audio_clip.duration
+                    self._set_progress('Trimming audio...', 0.0)
+                    duration = get_audio_info(audio_path)["duration"]
                     if end_sec is None or end_sec > duration:
                         end_sec = duration
                     if start_sec >= end_sec:
-                        audio_clip.close()
                         raise Exception('Start time must be less than end time.')
-                    trimmed_audio_path = os.path.join(temp_dir, f"{base_name}_trimmed_{int(start_sec)}_{int(end_sec)}.mp3")
-                    trimmed_clip = audio_clip.subclip(start_sec, end_sec)
-                    trimmed_clip.write_audiofile(trimmed_audio_path, logger=None)
-                    audio_clip.close()
-                    trimmed_clip.close()
+                    trimmed_audio_path = trim_audio(audio_path, start_sec, end_sec, temp_dir, base=base_name)
                     audio_to_transcribe = trimmed_audio_path
                 else:
                     audio_to_transcribe = audio_path
 
-                self.root.after(0, lambda: self.progress_var.set('Transcribing audio...'))
+                self._set_progress('Transcribing audio...', 0.0)
                 # Transcribe using SarvamBatchTranscriber (reuse logic from audio tab)
                 api_key = os.getenv('SARVAM_API_KEY')
                 if not api_key:
                     self.root.after(0, lambda: messagebox.showerror('API Key Error', 'SARVAM_API_KEY not set in environment.'))
-                    self.root.after(0, lambda: self.progress_var.set(''))
+                    self._set_progress('')
                     return
-                transcriber = SarvamBatchTranscriber(api_key, language_code='gu-IN')
+                transcriber = self._new_transcriber(api_key)
                 transcripts_dir = os.path.join(os.getcwd(), 'transcripts')
                 os.makedirs(transcripts_dir, exist_ok=True)
-                def progress_callback(status):
-                    self.root.after(0, lambda: self.progress_var.set(f'Transcribing: {status}'))
                 async def do_transcribe():
+                    resumable = False
                     try:
-                        await transcriber.transcribe_batch([audio_to_transcribe], transcripts_dir, progress_callback=progress_callback)
-                        self.root.after(0, lambda: self.progress_var.set('Done!'))
-                        self.root.after(0, lambda: messagebox.showinfo('Transcription Complete', f'Transcription complete! Check the transcripts directory.'))
+                        result = await transcriber.transcribe_batch([audio_to_transcribe], transcripts_dir, progress_callback=self._transcription_progress)
+                        resumable = self._report_transcription(result)
                     except Exception as e:
                         logger.error(f'Transcription failed: {e}\n{traceback.format_exc()}')
                         self.root.after(0, lambda e=e: messagebox.showerror('Transcription Error', f'Transcription failed: {e}'))
-                        self.root.after(0, lambda: self.progress_var.set('Error during transcription.'))
+                        self._set_progress('Error during transcription.')
                     finally:
-                        # Clean up temp files
-                        for f in [video_path, audio_path, trimmed_audio_path]:
+                        await transcriber.close()
+                        # Clean up temp files, unless a resume of the job still needs them
+                        for f in [audio_path, trimmed_audio_path]:
                             try:
-                                if f and os.path.exists(f):
+                                if not resumable and f and os.path.exists(f):
                                     os.remove(f)
                                     logger.info(f"Deleted temporary file: {f}")
                             except Exception as cleanup_err:
@@ -347,9 +442,9 @@ class MediaMagicGUI:
             except Exception as e:
                 logger.error(f'Video transcription error: {e}\n{traceback.format_exc()}')
                 self.root.after(0, lambda: messagebox.showerror('Error', f'Failed: {e}'))
-                self.root.after(0, lambda: self.progress_var.set('Error during processing.'))
+                self._set_progress('Error during processing.')
                 # Clean up temp files if any
-                for f in [video_path, audio_path, trimmed_audio_path]:
+                for f in [audio_path, trimmed_audio_path]:
                     try:
                         if f and os.path.exists(f):
                             os.remove(f)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from .audio_utils import get_cache_dir
+from .logger import logger
+
+# Steps of a batch transcription in the order they complete
+JOB_STEPS = ("created", "prepared", "initialized", "uploaded", "started", "completed", "downloaded", "done")
+
+
+def file_checksum(path, block_size=1024*1024):
+    """Return the SHA-256 hex digest of the file at path."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class JobJournal:
+    """
+    Small JSON record of one batch transcription's progress: the Sarvam job id and storage paths,
+    the files to upload with the checksums of those already uploaded, the last known job state and
+    the downloaded outputs. It is rewritten atomically after every step so a crashed run can be
+    resumed from the first step that has not finished.
+    """
+
+    def __init__(self, path, state):
+        self.path = path
+        self.state = state
+
+    @classmethod
+    def create(cls, local_files, destination_dir, chunk_duration_ms, language_code, journal_dir=None, **extra):
+        journal_dir = journal_dir or get_cache_dir("jobs")
+        journal_id = uuid.uuid4().hex
+        state = {
+            "id": journal_id,
+            "created_at": time.time(),
+            "step": "created",
+            "local_files": [os.path.abspath(f) for f in local_files],
+            "destination_dir": os.path.abspath(destination_dir),
+            "chunk_duration_ms": chunk_duration_ms,
+            "language_code": language_code,
+            "job_id": None,
+            "input_storage_path": None,
+            "output_storage_path": None,
+            "files_to_upload": None,
+            "chunked_files": [],
+            "source_names": {},
+            "total_duration": 0,
+            "chunk_offsets": {},
+            "cache_keys": {},
+            "cached_files": [],
+            "source_keys": {},
+            "cached_sources": [],
+            "upload_stats": None,
+            "uploaded": {},
+            "job_state": None,
+            "file_id_name_map": {},
+            "downloaded": [],
+        }
+        state.update(extra)
+        journal = cls(os.path.join(journal_dir, f"{journal_id}.json"), state)
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(path, json.load(f))
+
+    @classmethod
+    def list_pending(cls, journal_dir=None):
+        """Return the journals under journal_dir of runs that never finished, oldest first."""
+        journal_dir = journal_dir or get_cache_dir("jobs")
+        journals = []
+        for name in os.listdir(journal_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                journal = cls.load(os.path.join(journal_dir, name))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable job journal {name}: {e}")
+                continue
+            if journal.state["step"] != "done":
+                journals.append(journal)
+        return sorted(journals, key=lambda journal: journal.state["created_at"])
+
+    def reached(self, step):
+        return JOB_STEPS.index(self.state["step"]) >= JOB_STEPS.index(step)
+
+    def advance(self, step, **fields):
+        """Record fields and move the journal to step, unless it is already past it."""
+        if not self.reached(step):
+            fields["step"] = step
+        self.update(**fields)
+
+    def update(self, **fields):
+        self.state.update(fields)
+        self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        logger.debug(f"Saved job journal {self.path} at step {self.state['step']}")
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+            logger.info(f"Removed job journal {self.path}")
+        except FileNotFoundError:
+            pass
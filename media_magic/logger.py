@@ -1,5 +1,8 @@
 import logging
+import os
 
 FORMAT_CONS = '%(asctime)s %(name)-12s %(levelname)8s\t%(message)s'
 logging.basicConfig(level=logging.INFO, format=FORMAT_CONS)
-logger = logging.getLogger('media_magic') 
\ No newline at end of file
+logger = logging.getLogger('media_magic')
+# MEDIA_MAGIC_LOG_LEVEL=DEBUG brings back the per-call arguments and API payloads
+logger.setLevel(os.getenv('MEDIA_MAGIC_LOG_LEVEL', 'INFO').upper())
@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import shutil
+from typing import NamedTuple
+from .logger import logger
+
+OUTPUT_FORMATS = ("txt", "srt", "vtt", "jsonl")
+
+
+class Segment(NamedTuple):
+    """A piece of transcript; start and end are in seconds (None when the result carried no timestamps)."""
+    text: str
+    start: float = None
+    end: float = None
+    speaker: str = None
+
+
+def natural_key(name):
+    """Sort key that orders embedded numbers numerically, so chunk_2 comes before chunk_10."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def result_segments(result):
+    """
+    Return the Segments of one Sarvam speech-to-text result, preferring diarized entries, then timestamped
+    pieces, then the plain transcript as a single untimed segment.
+    """
+    if not result:
+        return []
+    diarized = (result.get("diarized_transcript") or {}).get("entries") or []
+    if diarized:
+        return [Segment(entry.get("transcript", ""), entry.get("start_time_seconds"), entry.get("end_time_seconds"),
+                        entry.get("speaker_id")) for entry in diarized]
+    timestamps = result.get("timestamps") or {}
+    words = timestamps.get("words") or []
+    if words:
+        starts = timestamps.get("start_time_seconds") or [None] * len(words)
+        ends = timestamps.get("end_time_seconds") or [None] * len(words)
+        return [Segment(word, start, end) for word, start, end in zip(words, starts, ends)]
+    transcript = result.get("transcript")
+    return [Segment(transcript)] if transcript else []
+
+
+def shift_segments(segments, chunk=None):
+    """Map segment times from chunk time onto the source audio timeline with chunk.source_time."""
+    if chunk is None:
+        return list(segments)
+    return [segment._replace(start=None if segment.start is None else chunk.source_time(segment.start),
+                             end=None if segment.end is None else chunk.source_time(segment.end))
+            for segment in segments]
+
+
+def _timestamp(seconds, separator):
+    milliseconds = int(round(max(0.0, seconds) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def _cue_text(segment):
+    return f"[{segment.speaker}] {segment.text}" if segment.speaker else segment.text
+
+
+def _seed_jsonl(txt_path, outfile):
+    """Write the lines of a TXT transcript written before its JSONL existed to outfile as untimed JSONL segments."""
+    with open(txt_path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                outfile.write(json.dumps({"start": None, "end": None, "text": line.strip(), "speaker": None,
+                                          "source": f"line {number}"}, ensure_ascii=False) + "\n")
+
+
+def publish_transcript(staged_path, final_path):
+    """
+    Move the transcript staged_path to final_path the way TranscriptWriter writes in place: a TXT or JSONL
+    is appended to an existing final file (a new JSONL first gets the lines of an existing TXT next to it),
+    while SRT and VTT replace it, as their cues are timed for a single run over the source.
+    Publish the JSONL of a run before its TXT, so the seed does not already hold the run.
+    """
+    if final_path.endswith((".txt", ".jsonl")) and (os.path.exists(final_path) or final_path.endswith(".jsonl")):
+        txt_path = os.path.splitext(final_path)[0] + ".txt"
+        with open(final_path, "a", encoding="utf-8") as outfile:
+            if final_path.endswith(".jsonl") and not outfile.tell() and os.path.exists(txt_path):
+                _seed_jsonl(txt_path, outfile)
+            with open(staged_path, "r", encoding="utf-8") as infile:
+                shutil.copyfileobj(infile, outfile)
+        os.remove(staged_path)
+    else:
+        os.replace(staged_path, final_path)
+
+
+class TranscriptWriter:
+    """
+    Streams the ordered results of one source file into {base}.txt, .srt, .vtt and .jsonl at once.
+    The TXT gets one line per result and JSONL one object per segment, both appended to existing files so
+    the JSONL, which search indexes instead of the TXT, keeps covering earlier runs; a new JSONL next to an
+    existing TXT starts with the TXT's lines. SRT and VTT get one cue per timed segment and are only kept
+    if a segment had timestamps.
+    """
+
+    def __init__(self, directory, base, formats=OUTPUT_FORMATS):
+        self.paths = {fmt: os.path.join(directory, f"{base}.{fmt}") for fmt in formats}
+        txt_path = os.path.join(directory, f"{base}.txt")
+        self._files = {}
+        for fmt, path in self.paths.items():
+            exists = os.path.exists(path)
+            self._files[fmt] = open(path, "a" if fmt in ("txt", "jsonl") and exists else "w", encoding="utf-8")
+            if fmt == "jsonl" and not exists and os.path.exists(txt_path):
+                _seed_jsonl(txt_path, self._files["jsonl"])
+        if "vtt" in self._files:
+            self._files["vtt"].write("WEBVTT\n\n")
+        self._cues = 0
+        self._segments = 0
+
+    def write_result(self, result, chunk=None, source=None):
+        """Add one chunk's result; chunk (a segmenter.Chunk) maps its timestamps onto the source audio."""
+        segments = shift_segments(result_segments(result), chunk)
+        if "txt" in self._files:
+            transcript = (result or {}).get("transcript") or " ".join(segment.text for segment in segments)
+            self._files["txt"].write(transcript + "\n")
+        for segment in segments:
+            self._segments += 1
+            if "jsonl" in self._files:
+                start = None if segment.start is None else round(segment.start, 3)
+                end = None if segment.end is None else round(segment.end, 3)
+                self._files["jsonl"].write(json.dumps({"start": start, "end": end, "text": segment.text,
+                                                       "speaker": segment.speaker, "source": source}, ensure_ascii=False) + "\n")
+            if segment.start is None or segment.end is None:
+                continue
+            self._cues += 1
+            if "srt" in self._files:
+                self._files["srt"].write(f"{self._cues}\n{_timestamp(segment.start, ',')} --> {_timestamp(segment.end, ',')}\n"
+                                         f"{_cue_text(segment)}\n\n")
+            if "vtt" in self._files:
+                self._files["vtt"].write(f"{_timestamp(segment.start, '.')} --> {_timestamp(segment.end, '.')}\n"
+                                         f"{_cue_text(segment)}\n\n")
+
+    def close(self):
+        """Close the outputs and return the paths written, dropping subtitle files without any cue."""
+        written = []
+        for fmt, f in self._files.items():
+            f.close()
+            if fmt in ("srt", "vtt") and not self._cues:
+                os.remove(self.paths[fmt])
+                continue
+            written.append(self.paths[fmt])
+        logger.info(f"Merged {self._segments} segments ({self._cues} timed) into {', '.join(written)}")
+        return written
@@ -0,0 +1,133 @@
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Upper bounds in seconds of the latency histogram buckets (Prometheus style, cumulative on export)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {"buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self._cumulative())),
+                "sum": self.sum, "count": self.count}
+
+    def _cumulative(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_text(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """
+    In-process counters and latency histograms with labels, cheap enough to update on every block.
+    span() times a stage into the stage_seconds histogram; export with to_json() or to_prometheus().
+    """
+
+    def __init__(self, prefix="media_magic"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextlib.contextmanager
+    def span(self, stage, **labels):
+        """Time the enclosed block (sync or async code) as one run of stage; failed runs are labelled outcome="error"."""
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=stage, outcome=outcome, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Return every series as plain data: {"counters": {name: [...]}, "histograms": {name: [...]}}."""
+        with self._lock:
+            return {
+                "counters": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                             for name, series in self._counters.items()},
+                "histograms": {name: [{"labels": dict(key), **histogram.snapshot()} for key, histogram in series.items()]
+                               for name, series in self._histograms.items()},
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full_name} counter")
+                for key, value in series.items():
+                    lines.append(f"{full_name}{_label_text(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, histogram in series.items():
+                    for bound, count in zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram._cumulative()):
+                        lines.append(f"{full_name}_bucket{_label_text(key, [('le', bound)])} {count}")
+                    lines.append(f"{full_name}_sum{_label_text(key)} {histogram.sum}")
+                    lines.append(f"{full_name}_count{_label_text(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Atomically write the metrics to path: JSON for a .json path, Prometheus text otherwise (e.g. a node_exporter .prom file)."""
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+# Shared instance updated by the transcription pipeline
+metrics = Metrics()
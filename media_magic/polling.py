@@ -0,0 +1,188 @@
+import asyncio
+import json
+import os
+import random
+from .audio_utils import get_cache_dir
+from .logger import logger
+
+TERMINAL_JOB_STATES = ("Completed", "Failed")
+DEFAULT_SPEED_RATIO = 0.1
+
+
+class JobStatusPoller:
+    """
+    Watches any number of Sarvam batch jobs from a single polling loop.
+
+    Each job gets its own schedule: the first poll lands around the expected processing time
+    (estimated from the audio duration and how long earlier jobs took), later polls back off
+    exponentially with jitter, and every job has an overall deadline. Status requests of all
+    watched jobs share one loop and are spaced by min_request_spacing, so running many jobs at
+    once does not multiply the request rate.
+
+    The learnt speed ratio is kept in state_path (poller_state.json in the cache directory by default),
+    so every poller, e.g. one per GUI run, starts from what earlier runs measured; an explicit
+    speed_ratio overrides the stored one.
+    """
+
+    def __init__(self, check_status, min_interval=2.0, max_interval=60.0, backoff_factor=1.5, jitter=0.2,
+                 base_processing_s=15.0, speed_ratio=None, history_weight=0.3, min_deadline=30*60,
+                 deadline_factor=10.0, max_failures=5, min_request_spacing=0.2, state_path=None):
+        self.check_status = check_status
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.base_processing_s = base_processing_s
+        self.state_path = state_path or os.path.join(get_cache_dir(), "poller_state.json")
+        # Processing seconds per second of audio, learnt from completed jobs
+        self.speed_ratio = self._load_speed_ratio() if speed_ratio is None else speed_ratio
+        self.history_weight = history_weight
+        self.min_deadline = min_deadline
+        self.deadline_factor = deadline_factor
+        self.max_failures = max_failures
+        self.min_request_spacing = min_request_spacing
+        self._jobs = {}
+        self._runner = None
+        self._wakeup = None
+
+    def expected_duration(self, audio_duration):
+        """Estimated wall time in seconds for a job over audio_duration seconds of audio."""
+        return self.base_processing_s + audio_duration * self.speed_ratio
+
+    async def wait(self, job_id, audio_duration=0, deadline=None, on_status=None):
+        """
+        Poll job_id until it reaches a terminal state and return its last status dict.
+        Returns None if the status could not be fetched max_failures times in a row.
+        Raises asyncio.TimeoutError once deadline seconds (derived from the expected duration when None) have passed.
+        on_status, if given, is called with every job_state seen.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        expected = self.expected_duration(audio_duration)
+        if deadline is None:
+            deadline = max(self.min_deadline, expected * self.deadline_factor)
+        job = {
+            "future": loop.create_future(),
+            "started": now,
+            "deadline": now + deadline,
+            "expected": expected,
+            "audio_duration": audio_duration,
+            "interval": None,
+            "next_poll": now + self._clamp(expected / 2),
+            "failures": 0,
+            "on_status": on_status,
+        }
+        logger.info(f"Watching job {job_id}: expected ~{expected:.0f}s, deadline {deadline:.0f}s")
+        self._jobs[job_id] = job
+        self._ensure_runner()
+        try:
+            return await job["future"]
+        finally:
+            if self._jobs.get(job_id) is job:
+                del self._jobs[job_id]
+
+    def _ensure_runner(self):
+        if self._runner is None or self._runner.done() or self._runner.get_loop() is not asyncio.get_running_loop():
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _next_interval(self, job, elapsed):
+        remaining = job["expected"] - elapsed
+        if remaining > self.min_interval:
+            # Still before the expected finish: close in on it by halving the remaining time
+            interval = self._clamp(remaining / 2)
+        else:
+            interval = self._clamp((job["interval"] or self.min_interval) * self.backoff_factor)
+        job["interval"] = interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _load_speed_ratio(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return float(json.load(f)["speed_ratio"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return DEFAULT_SPEED_RATIO
+
+    def _save_speed_ratio(self):
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"speed_ratio": self.speed_ratio}, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Failed to save poller state {self.state_path}: {e}")
+
+    def _record_completion(self, job, elapsed):
+        if job["audio_duration"] <= 0:
+            return
+        ratio = max(0.0, elapsed - self.base_processing_s) / job["audio_duration"]
+        self.speed_ratio = (1 - self.history_weight) * self.speed_ratio + self.history_weight * ratio
+        self._save_speed_ratio()
+        logger.info(f"Job took {elapsed:.0f}s for {job['audio_duration']:.0f}s of audio; speed ratio is now {self.speed_ratio:.3f}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._jobs:
+            now = loop.time()
+            for job_id, job in list(self._jobs.items()):
+                if not job["future"].done() and now >= job["deadline"]:
+                    logger.error(f"Job {job_id} did not finish before its deadline")
+                    job["future"].set_exception(asyncio.TimeoutError(f"Job {job_id} did not finish before its deadline"))
+            due = [(job_id, job) for job_id, job in list(self._jobs.items())
+                   if not job["future"].done() and job["next_poll"] <= now]
+            if not due:
+                pending = [job for job in self._jobs.values() if not job["future"].done()]
+                if not pending:
+                    await asyncio.sleep(0)
+                    continue
+                next_at = min(min(job["next_poll"], job["deadline"]) for job in pending)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_at - now))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for job_id, job in due:
+                await self._poll(job_id, job)
+                await asyncio.sleep(self.min_request_spacing)
+
+    async def _poll(self, job_id, job):
+        loop = asyncio.get_running_loop()
+        try:
+            job_status = await self.check_status(job_id)
+        except Exception as e:
+            logger.error(f"Status check for job {job_id} raised: {e}")
+            if not job["future"].done():
+                job["future"].set_exception(e)
+            return
+        if job["future"].done():
+            return
+        elapsed = loop.time() - job["started"]
+        if job_status is None:
+            job["failures"] += 1
+            logger.warning(f"Status check for job {job_id} failed ({job['failures']}/{self.max_failures})")
+            if job["failures"] >= self.max_failures:
+                job["future"].set_result(None)
+                return
+        else:
+            job["failures"] = 0
+            state = job_status.get("job_state")
+            if job["on_status"]:
+                try:
+                    job["on_status"](state)
+                except Exception as e:
+                    # The runner is shared by every watched job, so a broken callback must not end it
+                    logger.error(f"Status callback for job {job_id} raised: {e!r}")
+            if state in TERMINAL_JOB_STATES:
+                if state == "Completed":
+                    self._record_completion(job, elapsed)
+                job["future"].set_result(job_status)
+                return
+        interval = self._next_interval(job, elapsed)
+        logger.info(f"Job {job_id} not finished after {elapsed:.0f}s; next status check in {interval:.1f}s")
+        job["next_poll"] = loop.time() + interval
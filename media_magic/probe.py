@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import threading
+import time
+import wave
+from .audio_utils import get_cache_dir
+from .ffmpeg import run_ffmpeg
+from .logger import logger
+
+CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "6.1": 7, "7.1": 8}
+
+
+def _empty_info():
+    return {"duration": None, "sample_rate": None, "channels": None, "codec": None, "format": None}
+
+
+def _probe_wav(path):
+    """Read a PCM WAV header with the standard library; raises wave.Error for anything else."""
+    with wave.open(path, "rb") as w:
+        return {
+            "duration": w.getnframes() / w.getframerate(),
+            "sample_rate": w.getframerate(),
+            "channels": w.getnchannels(),
+            "codec": f"pcm_s{8 * w.getsampwidth()}le" if w.getsampwidth() > 1 else "pcm_u8",
+            "format": "wav",
+        }
+
+
+def _probe_ffmpeg(path):
+    """Parse the container and stream headers ffmpeg prints for path; no audio is decoded."""
+    header = run_ffmpeg(["-i", path], check=False).stderr.decode(errors="replace")
+    info = _empty_info()
+    match = re.search(r"Input #0, ([\w,]+), from", header)
+    if match:
+        info["format"] = match.group(1)
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", header)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    match = re.search(r"Stream #\d+:\d+.*?: Audio: (\w+)[^,\n]*, (\d+) Hz, ([^,\n]+)", header)
+    if match:
+        codec, sample_rate, layout = match.groups()
+        info["codec"] = codec
+        info["sample_rate"] = int(sample_rate)
+        layout = layout.strip()
+        channels = re.match(r"(\d+) channels", layout)
+        info["channels"] = int(channels.group(1)) if channels else CHANNEL_LAYOUTS.get(layout.split("(")[0])
+    return info
+
+
+def probe_audio(path):
+    """
+    Return {duration, sample_rate, channels, codec, format} of path by reading its headers only.
+    Fields that could not be determined are None.
+    """
+    if path.lower().endswith(".wav"):
+        try:
+            return _probe_wav(path)
+        except (wave.Error, EOFError, ZeroDivisionError):
+            pass
+    return _probe_ffmpeg(path)
+
+
+class MetadataCache:
+    """
+    Persistent cache of probe results keyed by (path, size, mtime), so a changed file is probed again.
+    Entries are kept in a JSON file and the least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(self, cache_path=None, max_entries=5000):
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "probe_cache.json")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save metadata cache {self.cache_path}: {e}")
+
+    @staticmethod
+    def _key(path):
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def get(self, path):
+        """Return the cached probe result for path, probing (and caching) it on a miss."""
+        key = self._key(path)
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None:
+                entry["used"] = time.time()
+                return dict(entry["info"])
+        info = probe_audio(path)
+        if info["duration"] is None:
+            return info
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"info": info, "used": time.time()}
+            if len(entries) > self.max_entries:
+                for old_key, _ in sorted(entries.items(), key=lambda item: item[1]["used"])[:len(entries) - self.max_entries]:
+                    del entries[old_key]
+            self._save()
+        return dict(info)
+
+
+_default_cache = None
+
+
+def get_audio_info(path):
+    """Return the probe result for path from the shared metadata cache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MetadataCache()
+    return _default_cache.get(path)
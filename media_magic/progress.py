@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import NamedTuple
+
+STAGE_LABELS = {"prepare": "Preparing audio", "upload": "Uploading", "download": "Downloading results"}
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class ProgressEvent(NamedTuple):
+    """
+    Byte progress of one stage of a batch: done and total bytes (total is 0 while unknown), the smoothed
+    rate in bytes per second and the estimated seconds left (None until there is a rate). job names the
+    batch job the event belongs to when several run at once (e.g. "2/5").
+    str() gives a one-line summary, so callbacks written for the plain status strings can display it as-is.
+    """
+    stage: str
+    done: int
+    total: int
+    rate: float
+    eta: float = None
+    job: str = None
+
+    @property
+    def fraction(self):
+        """Share of the stage done, between 0 and 1 (None while the total is unknown)."""
+        return min(1.0, self.done / self.total) if self.total else None
+
+    def __str__(self):
+        text = f"{STAGE_LABELS.get(self.stage, self.stage.capitalize())} {_format_bytes(self.done)}"
+        if self.job:
+            text = f"[job {self.job}] {text}"
+        if self.total:
+            text += f" of {_format_bytes(self.total)} ({self.fraction:.0%})"
+        if self.rate:
+            text += f", {_format_bytes(self.rate)}/s"
+        if self.eta is not None:
+            minutes, seconds = divmod(int(self.eta + 0.5), 60)
+            text += f", {minutes}:{seconds:02d} left"
+        return text
+
+
+class ProgressTracker:
+    """
+    Counts the bytes of one stage and passes ProgressEvents to callback, coalesced to at most one every
+    min_interval seconds (plus the final one from finish()), however often advance() is called.
+    advance() may be called from any thread; callback is called on the thread that triggers the report.
+    """
+
+    def __init__(self, callback, stage, total=0, min_interval=0.25, smoothing=0.3):
+        self.callback = callback
+        self.stage = stage
+        self.total = total
+        self.min_interval = min_interval
+        # Weight of the latest interval in the exponentially smoothed rate
+        self.smoothing = smoothing
+        self.done = 0
+        self.rate = None
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._reported_at = self._started
+        self._reported_done = 0
+
+    def expand(self, size):
+        """Add size bytes to the total, for stages whose sizes are only learnt as they go (e.g. downloads)."""
+        with self._lock:
+            self.total += size
+
+    def advance(self, size):
+        """Record size more bytes done; reports if min_interval has passed since the last report."""
+        now = time.monotonic()
+        with self._lock:
+            self.done += size
+            if now - self._reported_at < self.min_interval:
+                return
+            event = self._event(now)
+        self.callback(event)
+
+    def finish(self):
+        """Report the final state of the stage."""
+        with self._lock:
+            event = self._event(time.monotonic())
+        self.callback(event)
+
+    def _event(self, now):
+        interval = now - self._reported_at
+        if interval > 0:
+            latest = (self.done - self._reported_done) / interval
+            self.rate = latest if self.rate is None else self.smoothing * latest + (1 - self.smoothing) * self.rate
+        self._reported_at = now
+        self._reported_done = self.done
+        eta = None
+        if self.rate and self.total:
+            eta = max(0, self.total - self.done) / self.rate
+        return ProgressEvent(self.stage, self.done, self.total, self.rate or 0.0, eta)
@@ -0,0 +1,198 @@
+"""
+Full-text search over transcripts with SQLite FTS5.
+
+    python -m media_magic.search index transcripts/
+    python -m media_magic.search query "some phrase" [--limit 20] [--any]
+
+The index lives in the media_magic cache directory (transcripts.db) unless --db is given and is updated
+incrementally: a transcript is only re-read when its size or mtime changed. Transcripts with a .jsonl
+sibling are indexed from it (it holds every run appended to the .txt), so hits carry their chunk and timestamps;
+plain .txt files are indexed line by line.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import NamedTuple
+from .audio_utils import get_cache_dir
+from .logger import logger
+
+TRANSCRIPT_EXTENSIONS = (".jsonl", ".txt")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+-- Gujarati and other Indic vowel signs are marks (M*), which unicode61 would otherwise treat as separators
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text, file_id UNINDEXED, chunk UNINDEXED, start UNINDEXED, end UNINDEXED,
+    tokenize="unicode61 categories 'L* N* Co M*'"
+);
+"""
+
+
+class SearchHit(NamedTuple):
+    path: str
+    chunk: str
+    start: float
+    end: float
+    snippet: str
+
+
+def _read_segments(path):
+    """Yield (text, chunk, start, end) for every segment (.jsonl) or non-empty line (.txt) of a transcript."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                try:
+                    segment = json.loads(line)
+                except ValueError:
+                    continue
+                if segment.get("text"):
+                    yield segment["text"], segment.get("source"), segment.get("start"), segment.get("end")
+        else:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line.strip(), f"line {number}", None, None
+
+
+def _indexable(path):
+    """Whether path is a transcript that is indexed itself (a .txt with a .jsonl sibling is indexed from the .jsonl)."""
+    if not path.endswith(TRANSCRIPT_EXTENSIONS) or os.path.basename(path).startswith("."):
+        return False
+    return not (path.endswith(".txt") and os.path.exists(os.path.splitext(path)[0] + ".jsonl"))
+
+
+class TranscriptIndex:
+    """Incremental FTS5 index of transcript files keyed by (path, size, mtime)."""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_cache_dir(), "transcripts.db")
+        self._conn = sqlite3.connect(self.db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def index_file(self, path):
+        """(Re)index path if it changed since it was last indexed. Returns True if it was (re)indexed."""
+        path = os.path.abspath(path)
+        if not _indexable(path):
+            return False
+        stat = os.stat(path)
+        row = self._conn.execute("SELECT id, size, mtime_ns FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
+            return False
+        with self._conn:
+            if row:
+                file_id = row[0]
+                self._conn.execute("DELETE FROM segments WHERE file_id = ?", (file_id,))
+                self._conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?", (stat.st_size, stat.st_mtime_ns, file_id))
+            else:
+                file_id = self._conn.execute("INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                             (path, stat.st_size, stat.st_mtime_ns)).lastrowid
+            self._conn.executemany("INSERT INTO segments (text, file_id, chunk, start, end) VALUES (?, ?, ?, ?, ?)",
+                                   ((text, file_id, chunk, start, end) for text, chunk, start, end in _read_segments(path)))
+            # A .jsonl replaces the plain transcript it sits next to
+            if path.endswith(".jsonl"):
+                self._remove(os.path.splitext(path)[0] + ".txt")
+        logger.info(f"Indexed transcript {path}")
+        return True
+
+    def _remove(self, path):
+        row = self._conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM segments WHERE file_id = ?", (row[0],))
+            self._conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+    def update(self, directory):
+        """Bring the index of every transcript under directory up to date. Returns (reindexed, removed) counts."""
+        directory = os.path.abspath(directory)
+        seen = set()
+        reindexed = 0
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if _indexable(path):
+                    seen.add(path)
+                    reindexed += self.index_file(path)
+        prefix = directory.rstrip(os.sep) + os.sep
+        stale = [path for (path,) in self._conn.execute("SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+                 if path not in seen]
+        with self._conn:
+            for path in stale:
+                self._remove(path)
+        logger.info(f"Index of {directory} updated: {reindexed} transcripts (re)indexed, {len(stale)} removed")
+        return reindexed, len(stale)
+
+    def search(self, query, limit=20, phrase=True):
+        """
+        Return the best matching SearchHits for query, best first. With phrase the words must appear
+        together and in order; otherwise query is passed to FTS5 as-is (AND/OR/NEAR, prefix*).
+        """
+        if phrase:
+            query = '"' + query.replace('"', '""') + '"'
+        rows = self._conn.execute(
+            "SELECT files.path, segments.chunk, segments.start, segments.end, snippet(segments, 0, '[', ']', '…', 12) "
+            "FROM segments JOIN files ON files.id = segments.file_id "
+            "WHERE segments MATCH ? ORDER BY rank LIMIT ?", (query, limit))
+        return [SearchHit(*row) for row in rows]
+
+
+def index_transcripts(paths, db_path=None):
+    """Add or refresh the given transcript files in the index; errors are logged, never raised."""
+    try:
+        index = TranscriptIndex(db_path)
+        try:
+            for path in paths:
+                if os.path.exists(path):
+                    index.index_file(path)
+        finally:
+            index.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to update the transcript index: {e}")
+
+
+def _format_time(seconds):
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes // 60):02d}:{int(minutes % 60):02d}:{seconds:06.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m media_magic.search", description="Search transcripts.")
+    parser.add_argument("--db", help="Index database (default: transcripts.db in the media_magic cache directory)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index_parser = commands.add_parser("index", help="Index (incrementally) the transcripts under directories")
+    index_parser.add_argument("directories", nargs="+")
+    query_parser = commands.add_parser("query", help="Find a phrase")
+    query_parser.add_argument("query")
+    query_parser.add_argument("--limit", type=int, default=20)
+    query_parser.add_argument("--any", action="store_true", help="Treat the query as FTS5 syntax instead of a phrase")
+    args = parser.parse_args(argv)
+
+    index = TranscriptIndex(args.db)
+    try:
+        if args.command == "index":
+            for directory in args.directories:
+                index.update(directory)
+            return
+        started = time.perf_counter()
+        hits = index.search(args.query, args.limit, phrase=not args.any)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            when = f" {_format_time(hit.start)} --> {_format_time(hit.end)}" if hit.start is not None else ""
+            print(f"{hit.path} [{hit.chunk}]{when}: {hit.snippet}")
+        print(f"{len(hits)} hits in {elapsed_ms:.1f} ms")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import csv
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from .ffmpeg import run_ffmpeg
+from .logger import logger
+from .probe import get_audio_info
+
+# Audio codecs that can be cut without re-encoding, mapped to the extension used for their chunks
+STREAM_COPY_EXTENSIONS = {
+    "mp3": ".mp3",
+    "flac": ".flac",
+    "pcm_s16le": ".wav",
+    "aac": ".aac",
+    "vorbis": ".ogg",
+    "opus": ".ogg",
+}
+
+
+class UploadProfile(NamedTuple):
+    """Encoding used for audio prepared for upload: speech-to-text needs neither stereo nor more than 16 kHz."""
+    name: str
+    codec: str
+    ext: str
+    sample_rate: int
+    channels: int
+    codec_args: tuple
+
+    def ffmpeg_args(self):
+        return ["-ac", str(self.channels), "-ar", str(self.sample_rate), *self.codec_args]
+
+    def matches(self, info):
+        """Whether audio with the given probe info is already encoded with this profile."""
+        # Opus always decodes at 48 kHz, so that is the rate reported for any Opus file
+        sample_rate = 48000 if self.codec == "opus" else self.sample_rate
+        return (info.get("codec") == self.codec and info.get("sample_rate") == sample_rate
+                and info.get("channels") == self.channels)
+
+
+UPLOAD_PROFILES = {
+    "flac": UploadProfile("flac", "flac", ".flac", 16000, 1, ("-c:a", "flac", "-sample_fmt", "s16", "-compression_level", "8")),
+    "opus": UploadProfile("opus", "opus", ".ogg", 16000, 1, ("-c:a", "libopus", "-b:a", "24k", "-application", "voip")),
+}
+
+
+def get_upload_profile(profile):
+    """Resolve profile (None, a name from UPLOAD_PROFILES or an UploadProfile) to an UploadProfile or None."""
+    if profile is None or isinstance(profile, UploadProfile):
+        return profile
+    if profile not in UPLOAD_PROFILES:
+        raise ValueError(f"Unknown upload profile {profile!r}; expected one of {', '.join(UPLOAD_PROFILES)}")
+    return UPLOAD_PROFILES[profile]
+
+
+class Chunk(NamedTuple):
+    """
+    A chunk written by the segmenter; start and end are offsets in seconds into the source audio.
+    offsets is empty when the chunk is one contiguous range of the source. When silences were cut out of it,
+    offsets holds (chunk_time, source_time, length) spans mapping the chunk's audio back onto the source.
+    """
+    path: str
+    start: float
+    end: float
+    offsets: tuple = ()
+
+    def source_time(self, t):
+        """Map a time t in seconds within this chunk to the matching time in the source audio."""
+        if not self.offsets:
+            return self.start + t
+        for chunk_time, source_time, length in self.offsets:
+            if t < chunk_time + length:
+                return source_time + max(0.0, t - chunk_time)
+        chunk_time, source_time, length = self.offsets[-1]
+        return source_time + (t - chunk_time)
+
+
+def _chunk_format(audio_path, stream_copy, profile=None):
+    """Return (codec, extension, ffmpeg codec args) used to write the chunks of audio_path."""
+    profile = get_upload_profile(profile)
+    info = get_audio_info(audio_path) if stream_copy else {}
+    if profile:
+        # Audio already in the profile's encoding is cut without another lossy encode
+        if stream_copy and profile.matches(info):
+            return profile.codec, profile.ext, ["-c:a", "copy"]
+        return profile.codec, profile.ext, profile.ffmpeg_args()
+    codec = info.get("codec")
+    if codec in STREAM_COPY_EXTENSIONS:
+        return codec, STREAM_COPY_EXTENSIONS[codec], ["-c:a", "copy"]
+    return codec, ".wav", ["-c:a", "pcm_s16le"]
+
+
+def segment_audio(audio_path, chunk_duration_s, output_dir, base=None, stream_copy=True, profile=None):
+    """
+    Cut audio_path into consecutive chunks of chunk_duration_s seconds with a single ffmpeg run.
+    With an upload profile (see UPLOAD_PROFILES) every chunk is encoded with it, unless the source already matches
+    it and stream_copy is set. Otherwise, with stream_copy the audio packets are copied as-is when the source codec
+    allows it, else the source is decoded once and every chunk is written as 16-bit PCM WAV.
+    Chunks are named {base}_chunk_{n}.{ext} (n starting at 1) and returned in order with their exact offsets.
+    FLAC chunks are cut as 16-bit PCM WAV and encoded one by one afterwards: the segment muxer cannot go back to
+    fill in the STREAMINFO header of a finished FLAC chunk, which would be left with wrong sample counts.
+    """
+    base = base or os.path.splitext(os.path.basename(audio_path))[0]
+    codec, ext, codec_args = _chunk_format(audio_path, stream_copy, profile)
+    logger.info(f"Segmenting {audio_path} (codec: {codec or 'decoded'}) into {chunk_duration_s}s {ext} chunks")
+    flac_args = None
+    if ext == ".flac":
+        flac_args = ["-c:a", "flac"] if codec_args == ["-c:a", "copy"] else codec_args
+        profile = get_upload_profile(profile)
+        # Downmix and resample while cutting, so encoding the chunks only changes the codec
+        codec_args = ["-ac", str(profile.channels), "-ar", str(profile.sample_rate)] if profile else []
+        codec_args += ["-c:a", "pcm_s16le"]
+        ext = ".wav"
+    pattern = os.path.join(output_dir, f"{base.replace('%', '%%')}_chunk_%d{ext}")
+    list_fd, list_path = tempfile.mkstemp(suffix=".csv", dir=output_dir)
+    os.close(list_fd)
+    try:
+        run_ffmpeg([
+            "-loglevel", "error", "-y",
+            "-i", audio_path,
+            "-map", "0:a:0", "-vn",
+            *codec_args,
+            "-f", "segment",
+            "-segment_time", str(chunk_duration_s),
+            "-segment_start_number", "1",
+            "-reset_timestamps", "1",
+            "-segment_list", list_path,
+            "-segment_list_type", "csv",
+            pattern,
+        ])
+        chunks = []
+        with open(list_path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row:
+                    continue
+                name, start, end = row[0], float(row[1]), float(row[2])
+                chunks.append(Chunk(os.path.join(output_dir, os.path.basename(name)), start, end))
+    finally:
+        os.remove(list_path)
+    if flac_args:
+        chunks = encode_wav_chunks(chunks, flac_args, ".flac")
+    logger.info(f"Total chunks created and written: {len(chunks)}")
+    return chunks
+
+
+def encode_wav_chunks(chunks, codec_args, ext, output_dir=None, workers=None):
+    """
+    Encode WAV chunks with codec_args into {name}{ext} files in output_dir (default: next to each chunk), up to
+    workers (default: the CPU count) at once, deleting the WAV files. Returns the chunks with their new paths.
+    """
+    def encode(chunk):
+        name = os.path.splitext(os.path.basename(chunk.path))[0] + ext
+        out_path = os.path.join(output_dir or os.path.dirname(chunk.path), name)
+        try:
+            run_ffmpeg(["-loglevel", "error", "-y", "-i", chunk.path, *codec_args, out_path])
+        finally:
+            os.remove(chunk.path)
+        return chunk._replace(path=out_path)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return list(pool.map(encode, chunks))
+
+
+def _encode_range(audio_path, start, length, chunk_path, codec_args):
+    run_ffmpeg([
+        "-loglevel", "error", "-y",
+        "-ss", f"{start:.6f}", "-t", f"{length:.6f}",
+        "-i", audio_path,
+        "-map", "0:a:0", "-vn",
+        *codec_args,
+        chunk_path,
+    ])
+    logger.info(f"Wrote chunk {chunk_path} ({start:.1f}s - {start + length:.1f}s)")
+    return chunk_path
+
+
+def segment_audio_parallel(audio_path, chunk_duration_s, output_dir, base=None, stream_copy=True, workers=None,
+                           profile=None):
+    """
+    Same contract as segment_audio, but every chunk is encoded by its own ffmpeg process seeking straight to
+    its time range, with up to workers processes running at once (defaults to the CPU count).
+    Falls back to segment_audio when the duration of the source is unknown or the chunks are stream copied:
+    a copy can only be cut on packet boundaries, so -ss/-t ranges would overlap at the joins, while the
+    segment muxer reports the offsets it actually cut at (and copying gains little from parallelism).
+    """
+    base = base or os.path.splitext(os.path.basename(audio_path))[0]
+    duration = get_audio_info(audio_path)["duration"]
+    if not duration:
+        logger.warning(f"Unknown duration for {audio_path}; segmenting serially")
+        return segment_audio(audio_path, chunk_duration_s, output_dir, base, stream_copy, profile)
+    codec, ext, codec_args = _chunk_format(audio_path, stream_copy, profile)
+    if codec_args == ["-c:a", "copy"]:
+        return segment_audio(audio_path, chunk_duration_s, output_dir, base, stream_copy, profile)
+    workers = workers or os.cpu_count() or 1
+    chunks = []
+    start = 0.0
+    while duration - start > 0.01:
+        end = min(start + chunk_duration_s, duration)
+        chunks.append(Chunk(os.path.join(output_dir, f"{base}_chunk_{len(chunks) + 1}{ext}"), start, end))
+        start = end
+    logger.info(f"Encoding {len(chunks)} chunks of {audio_path} (codec: {codec or 'decoded'}) with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_encode_range, audio_path, chunk.start, chunk.end - chunk.start, chunk.path, codec_args)
+                   for chunk in chunks]
+        for future in futures:
+            future.result()
+    logger.info(f"Total chunks created and written: {len(chunks)}")
+    return chunks
+
+
+def trim_audio(audio_path, start_s, end_s, output_dir, base=None, profile=None):
+    """
+    Write the start_s..end_s range of audio_path to output_dir, encoded with the upload profile if given (copied
+    as-is if the source already matches it). Without one the audio is not re-encoded when the codec allows it,
+    falling back to a PCM WAV decode otherwise.
+    Returns the path of the trimmed file.
+    """
+    base = base or os.path.splitext(os.path.basename(audio_path))[0]
+    codec, ext, codec_args = _chunk_format(audio_path, stream_copy=True, profile=profile)
+    trimmed_path = os.path.join(output_dir, f"{base}_trimmed_{int(start_s)}_{int(end_s)}{ext}")
+    logger.info(f"Trimming {audio_path} from {start_s}s to {end_s}s into {trimmed_path} (codec: {codec})")
+    try:
+        _encode_range(audio_path, start_s, end_s - start_s, trimmed_path, codec_args)
+    except RuntimeError as e:
+        if codec_args != ["-c:a", "copy"]:
+            raise
+        logger.warning(f"Stream copy trim failed ({e}); decoding instead")
+        if os.path.exists(trimmed_path):
+            os.remove(trimmed_path)
+        profile = get_upload_profile(profile)
+        if profile:
+            _encode_range(audio_path, start_s, end_s - start_s, trimmed_path, profile.ffmpeg_args())
+        else:
+            trimmed_path = os.path.splitext(trimmed_path)[0] + ".wav"
+            _encode_range(audio_path, start_s, end_s - start_s, trimmed_path, ["-c:a", "pcm_s16le"])
+    return trimmed_path
+
+
+def transcode_audio(audio_path, output_dir, profile, base=None):
+    """
+    Encode the whole of audio_path with the upload profile into output_dir as {base}{ext}.
+    Returns the path of the new file.
+    """
+    profile = get_upload_profile(profile)
+    base = base or os.path.splitext(os.path.basename(audio_path))[0]
+    out_path = os.path.join(output_dir, f"{base}{profile.ext}")
+    if os.path.abspath(out_path) == os.path.abspath(audio_path):
+        out_path = os.path.join(output_dir, f"{base}_{profile.name}{profile.ext}")
+    run_ffmpeg(["-loglevel", "error", "-y", "-i", audio_path, "-map", "0:a:0", "-vn", *profile.ffmpeg_args(), out_path])
+    logger.info(f"Encoded {audio_path} ({os.path.getsize(audio_path)} bytes) with the {profile.name} upload profile "
+                f"into {out_path} ({os.path.getsize(out_path)} bytes)")
+    return out_path
@@ -0,0 +1,215 @@
+import math
+import os
+import shutil
+import tempfile
+import wave
+import numpy as np
+from .logger import logger
+from .ffmpeg import iter_ffmpeg_output
+from .segmenter import Chunk, encode_wav_chunks, get_upload_profile
+
+ANALYSIS_SAMPLE_RATE = 16000
+
+
+def iter_pcm(audio_path, sample_rate=ANALYSIS_SAMPLE_RATE, block_samples=1024*1024):
+    """
+    Decode the first audio stream of audio_path to mono 16-bit PCM at sample_rate and yield it as int16 arrays
+    of up to block_samples samples, so the whole recording is never held in memory.
+    """
+    pending = b""
+    for block in iter_ffmpeg_output([
+        "-loglevel", "error",
+        "-i", audio_path,
+        "-map", "0:a:0", "-vn",
+        "-ac", "1", "-ar", str(sample_rate),
+        "-f", "s16le", "-",
+    ], block_size=block_samples * 2):
+        block = pending + block if pending else block
+        usable = len(block) - len(block) % 2
+        pending = block[usable:]
+        if usable:
+            yield np.frombuffer(block[:usable], dtype=np.int16)
+
+
+def frame_energy_db(samples, sample_rate, frame_s=0.03, block_frames=10000):
+    """Return the RMS level in dBFS of every frame_s long frame of samples."""
+    frame_len = max(1, int(sample_rate * frame_s))
+    n_frames = len(samples) // frame_len
+    energy = np.empty(n_frames, dtype=np.float32)
+    # Work through the frames in blocks so the float copy never holds the whole recording
+    for first in range(0, n_frames, block_frames):
+        last = min(n_frames, first + block_frames)
+        frames = samples[first * frame_len:last * frame_len].astype(np.float32).reshape(last - first, frame_len) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy[first:last] = 20 * np.log10(np.maximum(rms, 1e-10))
+    return energy
+
+
+def stream_energy_db(blocks, sample_rate, frame_s=0.03):
+    """
+    Return (the RMS level in dBFS of every frame_s long frame, the number of samples) of a stream of PCM blocks.
+    Only the levels are kept (about 0.5 MB per hour at 30 ms frames), as the silence threshold depends on all of them.
+    """
+    frame_len = max(1, int(sample_rate * frame_s))
+    energies = []
+    carry = np.empty(0, dtype=np.int16)
+    total = 0
+    for block in blocks:
+        total += len(block)
+        samples = np.concatenate((carry, block)) if len(carry) else block
+        usable = len(samples) - len(samples) % frame_len
+        energies.append(frame_energy_db(samples[:usable], sample_rate, frame_s))
+        carry = samples[usable:]
+    return (np.concatenate(energies) if energies else np.empty(0, dtype=np.float32)), total
+
+
+def find_silences(energy_db, frame_s, relative_threshold_db=-35.0, floor_db=-60.0, min_silence_s=0.3):
+    """
+    Return (start, end) times in seconds of the silent stretches of at least min_silence_s.
+    A frame is silent when it is relative_threshold_db below the loud (95th percentile) level of the
+    recording, or below floor_db, whichever threshold is higher.
+    """
+    if len(energy_db) == 0:
+        return []
+    threshold = max(float(np.percentile(energy_db, 95)) + relative_threshold_db, floor_db)
+    silent = np.concatenate(([False], energy_db < threshold, [False]))
+    edges = np.flatnonzero(np.diff(silent.astype(np.int8)))
+    min_frames = math.ceil(min_silence_s / frame_s)
+    return [(float(start * frame_s), float(end * frame_s))
+            for start, end in zip(edges[0::2], edges[1::2]) if end - start >= min_frames]
+
+
+def plan_cuts(duration, chunk_duration_s, silences, search_s=10.0, min_gap_s=0.3):
+    """
+    Return chunk boundaries [0, ..., duration] with no chunk longer than chunk_duration_s.
+    Each cut is moved back by up to search_s seconds into the silence nearest the fixed-length position,
+    so chunks stay close to chunk_duration_s; silences with less than min_gap_s inside the search window
+    are ignored. Falls back to the plain fixed-length position when there is none.
+    """
+    starts = np.array([s for s, _ in silences], dtype=np.float64)
+    ends = np.array([e for _, e in silences], dtype=np.float64)
+    boundaries = [0.0]
+    start = 0.0
+    while duration - start > chunk_duration_s:
+        target = start + chunk_duration_s
+        low = max(start + chunk_duration_s / 2, target - search_s)
+        cut = target
+        if len(starts):
+            gap_starts = np.maximum(starts, low)
+            gap_ends = np.minimum(ends, target)
+            usable = np.flatnonzero(gap_ends - gap_starts >= min_gap_s)
+            if len(usable):
+                nearest = usable[int(np.argmax(gap_ends[usable]))]
+                cut = float(gap_starts[nearest] + gap_ends[nearest]) / 2
+        boundaries.append(cut)
+        start = cut
+    boundaries.append(duration)
+    return boundaries
+
+
+def keep_spans(duration, silences, strip_min_s=1.0, pad_s=0.2):
+    """Return the (start, end) spans left after dropping silences longer than strip_min_s, keeping pad_s of each edge."""
+    spans = []
+    position = 0.0
+    for start, end in silences:
+        if end - start < strip_min_s:
+            continue
+        if start + pad_s > position:
+            spans.append((position, start + pad_s))
+        position = max(position, end - pad_s)
+    if duration > position:
+        spans.append((position, duration))
+    return spans
+
+
+def _open_wav(path, sample_rate):
+    w = wave.open(path, "wb")
+    w.setnchannels(1)
+    w.setsampwidth(2)
+    w.setframerate(sample_rate)
+    return w
+
+
+def _write_wav_chunks(audio_path, sample_rate, planned):
+    """
+    Decode audio_path once more and stream the sample ranges of every planned (path, [(first, last sample)])
+    chunk into its WAV file, in order, so no more than one decoded block is held at a time.
+    """
+    ranges = [(first, last, index) for index, (_, pieces) in enumerate(planned) for first, last in pieces]
+    writer = None
+    current = 0
+    position = 0
+    try:
+        for block in iter_pcm(audio_path, sample_rate):
+            block_end = position + len(block)
+            while current < len(ranges) and ranges[current][0] < block_end:
+                first, last, index = ranges[current]
+                if writer is None:
+                    writer = _open_wav(planned[index][0], sample_rate)
+                writer.writeframes(block[max(first, position) - position:min(last, block_end) - position].tobytes())
+                if last > block_end:
+                    break
+                current += 1
+                if current == len(ranges) or ranges[current][2] != index:
+                    writer.close()
+                    writer = None
+            position = block_end
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def split_on_silence(audio_path, chunk_duration_s, output_dir, base=None, search_s=10.0, strip_silence=False,
+                     strip_min_s=1.0, pad_s=0.2, relative_threshold_db=-35.0, min_silence_s=0.3,
+                     sample_rate=ANALYSIS_SAMPLE_RATE, profile=None):
+    """
+    Split audio_path into chunks of at most chunk_duration_s seconds, placing each cut in a nearby silence.
+    With strip_silence, silences longer than strip_min_s are dropped from the chunks and each chunk's
+    offsets map its audio back onto the source timeline (see Chunk.source_time); chunks that are silent
+    throughout are skipped. Chunks are written as mono 16-bit WAV at sample_rate, named {base}_chunk_{n}.wav,
+    or encoded with the upload profile if one is given (see segmenter.UPLOAD_PROFILES).
+    """
+    profile = get_upload_profile(profile)
+    base = base or os.path.splitext(os.path.basename(audio_path))[0]
+    frame_s = 0.03
+    energy_db, total_samples = stream_energy_db(iter_pcm(audio_path, sample_rate), sample_rate, frame_s)
+    duration = total_samples / sample_rate
+    silences = find_silences(energy_db, frame_s, relative_threshold_db, min_silence_s=min_silence_s)
+    boundaries = plan_cuts(duration, chunk_duration_s, silences, search_s)
+    spans = keep_spans(duration, silences, strip_min_s, pad_s) if strip_silence else [(0.0, duration)]
+    logger.info(f"Found {len(silences)} silences in {audio_path} ({duration:.1f}s); cutting into {len(boundaries) - 1} chunks")
+
+    # With a profile the WAV chunks are written to a scratch directory and encoded from there into output_dir
+    wav_dir = tempfile.mkdtemp(prefix=".split_", dir=output_dir) if profile else output_dir
+    chunks = []
+    planned = []
+    kept_total = 0.0
+    for chunk_start, chunk_end in zip(boundaries[:-1], boundaries[1:]):
+        pieces = [(max(a, chunk_start), min(b, chunk_end)) for a, b in spans if b > chunk_start and a < chunk_end]
+        pieces = [(a, b) for a, b in pieces if b - a > 0.01]
+        if not pieces:
+            logger.info(f"Skipping silent range {chunk_start:.1f}s - {chunk_end:.1f}s")
+            continue
+        path = os.path.join(wav_dir, f"{base}_chunk_{len(chunks) + 1}.wav")
+        planned.append((path, [(int(a * sample_rate), int(b * sample_rate)) for a, b in pieces]))
+        offsets = ()
+        if len(pieces) > 1:
+            chunk_time = 0.0
+            spans_in_chunk = []
+            for a, b in pieces:
+                spans_in_chunk.append((chunk_time, a, b - a))
+                chunk_time += b - a
+            offsets = tuple(spans_in_chunk)
+        kept_total += sum(b - a for a, b in pieces)
+        chunks.append(Chunk(path, pieces[0][0], pieces[-1][1], offsets))
+    try:
+        _write_wav_chunks(audio_path, sample_rate, planned)
+        if profile:
+            chunks = encode_wav_chunks(chunks, profile.ffmpeg_args(), profile.ext, output_dir)
+    finally:
+        if profile:
+            shutil.rmtree(wav_dir, ignore_errors=True)
+    if strip_silence:
+        logger.info(f"Kept {kept_total:.1f}s of {duration:.1f}s after stripping silences")
+    logger.info(f"Total chunks created and written: {len(chunks)}")
+    return chunks
@@ -1,15 +1,27 @@
-import requests
 import os
+from .journal import JobJournal, file_checksum
 from .logger import logger
-from azure.storage.filedatalake.aio import DataLakeDirectoryClient, FileSystemClient
-from azure.storage.filedatalake import ContentSettings
-import aiofiles
+from .polling import JobStatusPoller
+from .probe import get_audio_info
+from .progress import ProgressEvent, ProgressTracker
+from .metrics import metrics
+from .merge import OUTPUT_FORMATS, TranscriptWriter, natural_key, publish_transcript
+from .search import index_transcripts
+from .segmenter import Chunk, get_upload_profile, segment_audio, segment_audio_parallel, transcode_audio
+from .transcript_cache import TranscriptCache
 import mimetypes
 import asyncio
+import contextlib
 from urllib.parse import urlparse
 import json
-from moviepy import editor
 import datetime
+import hashlib
+import shutil
+import tempfile
+import time
+
+# The Azure SDK, aiohttp, aiofiles and numpy (silence) take most of a second to import, so they are
+# imported by the methods that need them: opening the GUI or importing this module stays fast.
 
 # class SarvamTranscriber:
 #     """
@@ -54,61 +66,152 @@ import datetime
 #             files['audio'].close()
 
 class SarvamBatchTranscriber:
-    API_INIT_URL = "https://api.sarvam.ai/speech-to-text/job/init"
-    API_START_URL = "https://api.sarvam.ai/speech-to-text/job"
-    API_STATUS_URL = "https://api.sarvam.ai/speech-to-text/job/{job_id}/status"
+    API_BASE_URL = "https://api.sarvam.ai"
+    API_INIT_URL = API_BASE_URL + "/speech-to-text/job/init"
+    API_START_URL = API_BASE_URL + "/speech-to-text/job"
+    API_STATUS_URL = API_BASE_URL + "/speech-to-text/job/{job_id}/status"
 
-    def __init__(self, api_key: str, language_code: str = "unknown"):
+    def __init__(self, api_key: str, language_code: str = "unknown",
+                 request_timeout: float = 30, connect_timeout: float = 10,
+                 max_connections: int = 20, keepalive_timeout: float = 60, poller: JobStatusPoller = None,
+                 upload_block_size: int = 4*1024*1024, upload_block_concurrency: int = 4,
+                 upload_memory_budget: int = 64*1024*1024, max_concurrent_downloads: int = 8,
+                 download_chunk_size: int = 4*1024*1024, stream_copy_chunks: bool = True,
+                 encode_workers: int = 1, silence_aware_chunks: bool = False, strip_silence: bool = False,
+                 use_transcript_cache: bool = True, journal_dir: str = None, upload_profile: str = "opus",
+                 with_timestamps: bool = True, output_formats=OUTPUT_FORMATS, search_index: bool = True,
+                 api_base_url: str = None, progress_interval: float = 0.25):
         self.api_key = api_key
+        # Send the job API calls to another host, e.g. the local fake in benchmarks/fake_sarvam.py
+        if api_base_url:
+            for name in ("API_INIT_URL", "API_START_URL", "API_STATUS_URL"):
+                setattr(self, name, getattr(self, name).replace(self.API_BASE_URL, api_base_url.rstrip("/"), 1))
         self.language_code = language_code
         self.lock = asyncio.Lock()
+        self.request_timeout = request_timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._session_loop = None
+        self.poller = poller or JobStatusPoller(self.check_job_status)
+        self.upload_block_size = upload_block_size
+        self.upload_block_concurrency = upload_block_concurrency
+        self.upload_memory_budget = upload_memory_budget
+        self._upload_budget = None
+        self._upload_budget_loop = None
+        self.max_concurrent_downloads = max_concurrent_downloads
+        self.download_chunk_size = download_chunk_size
+        self.stream_copy_chunks = stream_copy_chunks
+        # Number of ffmpeg processes used to encode chunks; 1 keeps the single-pass serial segmenter
+        self.encode_workers = encode_workers
+        # Place chunk cuts in nearby silences, and optionally drop long silences before upload
+        self.silence_aware_chunks = silence_aware_chunks
+        self.strip_silence = strip_silence
+        self.transcript_cache = TranscriptCache() if use_transcript_cache else None
+        # Where job journals are kept for resume_job/resume_pending (defaults to the media_magic cache directory)
+        self.journal_dir = journal_dir
+        # Encoding of everything uploaded (see segmenter.UPLOAD_PROFILES); None uploads the source audio as-is
+        self.upload_profile = get_upload_profile(upload_profile)
+        # Request segment timestamps so merged transcripts can be written as SRT/VTT/JSONL on the source timeline
+        self.with_timestamps = with_timestamps
+        self.output_formats = tuple(output_formats)
+        # Add finished transcripts to the full-text search index (see search.py)
+        self.search_index = search_index
+        # Minimum seconds between two byte progress reports (ProgressEvents) of a stage to progress_callback
+        self.progress_interval = progress_interval
 
-    async def initialize_job(self):
-        logger.info("Called initialize_job")
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self):
+        """
+        Return the shared keep-alive HTTP session, creating it on first use.
+        A session is bound to the event loop it was created on, so a new one is made if the loop changed.
+        """
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_timeout)
+            timeout = aiohttp.ClientTimeout(total=self.request_timeout, connect=self.connect_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._session_loop = loop
+            logger.info(f"Created HTTP session (max_connections={self.max_connections}, timeout={self.request_timeout}s)")
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session if it is open on the current event loop."""
+        if self._session is not None and not self._session.closed:
+            if self._session_loop is asyncio.get_running_loop():
+                await self._session.close()
+                logger.info("Closed HTTP session")
+        self._session = None
+        self._session_loop = None
+
+    async def _api_request(self, method, url, expected_status, action, **kwargs):
+        """
+        Send a request to the Sarvam API on the shared session.
+        Returns the decoded JSON body when the response has the expected status, else None.
+        """
+        import aiohttp
         headers = {"API-Subscription-Key": self.api_key}
-        logger.info("Initializing batch job...")
-        response = requests.post(self.API_INIT_URL, headers=headers)
-        logger.info(f"initialize_job response status: {response.status_code}")
-        if response.status_code == 202:
-            logger.info(f"Job initialized: {response.json()}")
-            return response.json()
-        else:
-            logger.error(f"Failed to initialize job: {response.text}")
+        headers.update(kwargs.pop("headers", {}))
+        started = time.perf_counter()
+        status = "error"
+        try:
+            async with self._get_session().request(method, url, headers=headers, **kwargs) as response:
+                status = response.status
+                logger.debug(f"{action} response status: {response.status}")
+                if response.status == expected_status:
+                    return await response.json(content_type=None)
+                logger.error(f"Failed to {action.replace('_', ' ')}: {await response.text()}")
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to {action.replace('_', ' ')}: {e!r}")
             return None
+        finally:
+            metrics.observe("api_request_seconds", time.perf_counter() - started, action=action)
+            metrics.inc("api_requests_total", action=action, status=status)
+
+    async def initialize_job(self):
+        logger.debug("Called initialize_job")
+        logger.info("Initializing batch job...")
+        job_info = await self._api_request("POST", self.API_INIT_URL, 202, "initialize_job")
+        if job_info is not None:
+            logger.debug(f"Job initialized: {job_info}")
+        return job_info
 
     async def check_job_status(self, job_id):
-        logger.info(f"Called check_job_status with job_id: {job_id}")
+        logger.debug(f"Called check_job_status with job_id: {job_id}")
         url = self.API_STATUS_URL.format(job_id=job_id)
-        headers = {"API-Subscription-Key": self.api_key}
-        logger.info(f"Checking status for job: {job_id}")
-        response = requests.get(url, headers=headers)
-        logger.info(f"check_job_status response status: {response.status_code}")
-        if response.status_code == 200:
-            logger.info(f"Job status: {response.json()}")
-            return response.json()
-        else:
-            logger.error(f"Failed to get job status: {response.text}")
-            return None
+        logger.debug(f"Checking status for job: {job_id}")
+        job_status = await self._api_request("GET", url, 200, "check_job_status")
+        if job_status is not None:
+            logger.debug(f"Job status: {job_status}")
+        return job_status
 
     async def start_job(self, job_id):
-        logger.info(f"Called start_job with job_id: {job_id}")
-        headers = {
-            "API-Subscription-Key": self.api_key,
-            "Content-Type": "application/json",
-        }
+        logger.debug(f"Called start_job with job_id: {job_id}")
         data = {"job_id": job_id, "job_parameters": {"language_code": self.language_code}}
-        logger.info(f"Starting job: {job_id} with data: {data}")
-        response = requests.post(self.API_START_URL, headers=headers, data=json.dumps(data))
-        logger.info(f"start_job response status: {response.status_code}")
-        if response.status_code == 200:
-            logger.info(f"Job started: {response.json()}")
-            return response.json()
-        else:
-            logger.error(f"Failed to start job: {response.text}")
+        if self.with_timestamps:
+            data["job_parameters"]["with_timestamps"] = True
+        logger.debug(f"Starting job: {job_id} with data: {data}")
+        job_start_response = await self._api_request("POST", self.API_START_URL, 200, "start_job", json=data)
+        if job_start_response is not None:
+            logger.debug(f"Job started: {job_start_response}")
+        return job_start_response
+
+    def _progress_tracker(self, progress_callback, stage, total=0):
+        """Return a ProgressTracker reporting stage to progress_callback, or None when there is no callback."""
+        if not progress_callback:
             return None
+        return ProgressTracker(progress_callback, stage, total, self.progress_interval)
 
     def _extract_url_components(self, url: str):
-        logger.info(f"Called _extract_url_components with url: {url}")
+        logger.debug(f"Called _extract_url_components with url: {url}")
         parsed_url = urlparse(url)
         account_url = f"{parsed_url.scheme}://{parsed_url.netloc}".replace(
             ".blob.", ".dfs."
@@ -117,13 +220,19 @@ class SarvamBatchTranscriber:
         file_system_name = path_components[0]
         directory_name = "/".join(path_components[1:])
         sas_token = parsed_url.query
-        logger.info(f"Extracted account_url: {account_url}, file_system_name: {file_system_name}, directory_name: {directory_name}")
+        logger.debug(f"Extracted account_url: {account_url}, file_system_name: {file_system_name}, directory_name: {directory_name}")
         return account_url, file_system_name, directory_name, sas_token
 
-    async def upload_files(self, input_storage_url, local_file_paths, overwrite=True):
-        logger.info(f"Called upload_files with input_storage_url: {input_storage_url}, local_file_paths: {local_file_paths}, overwrite: {overwrite}")
+    async def upload_files(self, input_storage_url, local_file_paths, overwrite=True, progress=None):
+        """
+        Upload local_file_paths into the storage directory at input_storage_url.
+        Returns a dict mapping each successfully uploaded path to the SHA-256 of its content.
+        progress, a ProgressTracker, is advanced as every block is appended.
+        """
+        logger.debug(f"Called upload_files with input_storage_url: {input_storage_url}, local_file_paths: {local_file_paths}, overwrite: {overwrite}")
         account_url, file_system_name, directory_name, sas_token = self._extract_url_components(input_storage_url)
         logger.info(f"Uploading {len(local_file_paths)} files to {directory_name}")
+        from azure.storage.filedatalake.aio import DataLakeDirectoryClient
         async with DataLakeDirectoryClient(
             account_url=f"{account_url}?{sas_token}",
             file_system_name=file_system_name,
@@ -133,37 +242,98 @@ class SarvamBatchTranscriber:
             tasks = []
             for path in local_file_paths:
                 file_name = os.path.basename(path)
-                logger.info(f"Preparing to upload file: {file_name}")
-                tasks.append(self._upload_file(directory_client, path, file_name, overwrite))
+                logger.debug(f"Preparing to upload file: {file_name}")
+                tasks.append(self._upload_file(directory_client, path, file_name, overwrite, progress))
             results = await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Upload completed for {sum(1 for r in results if not isinstance(r, Exception))} files")
+            uploaded = {}
             for idx, result in enumerate(results):
                 if isinstance(result, Exception):
                     logger.error(f"Error uploading file {local_file_paths[idx]}: {result}")
+                elif result:
+                    uploaded[local_file_paths[idx]] = result
+            logger.info(f"Upload completed for {len(uploaded)}/{len(local_file_paths)} files")
+            return uploaded
 
-    async def _upload_file(self, directory_client, local_file_path, file_name, overwrite=True):
-        logger.info(f"Called _upload_file with local_file_path: {local_file_path}, file_name: {file_name}, overwrite: {overwrite}")
+    def _get_upload_budget(self):
+        """
+        Return the semaphore that caps the number of upload blocks held in memory across all uploads
+        of this transcriber, so peak memory is about upload_memory_budget however many files are in flight.
+        """
+        loop = asyncio.get_running_loop()
+        if self._upload_budget is None or self._upload_budget_loop is not loop:
+            blocks = max(1, self.upload_memory_budget // self.upload_block_size)
+            self._upload_budget = asyncio.Semaphore(blocks)
+            self._upload_budget_loop = loop
+        return self._upload_budget
+
+    async def _append_block(self, file_client, block, offset, budget, file_slots, progress=None):
+        try:
+            await file_client.append_data(block, offset=offset, length=len(block))
+            metrics.inc("upload_bytes_total", len(block))
+            if progress:
+                progress.advance(len(block))
+        finally:
+            file_slots.release()
+            budget.release()
+
+    async def _upload_file(self, directory_client, local_file_path, file_name, overwrite=True, progress=None):
+        """
+        Stream local_file_path to the data lake in upload_block_size blocks.
+        Up to upload_block_concurrency blocks of this file are appended in parallel and blocks are
+        only read from disk once the shared memory budget has room for them.
+        Returns the SHA-256 hex digest of the uploaded content, or False on failure.
+        """
+        logger.debug(f"Called _upload_file with local_file_path: {local_file_path}, file_name: {file_name}, overwrite: {overwrite}")
+        import aiofiles
+        from azure.core import MatchConditions
+        from azure.storage.filedatalake import ContentSettings
+        budget = self._get_upload_budget()
+        file_slots = asyncio.Semaphore(self.upload_block_concurrency)
+        tasks = []
+        checksum = hashlib.sha256()
         try:
+            mime_type = mimetypes.guess_type(local_file_path)[0] or "audio/wav"
+            content_settings = ContentSettings(content_type=mime_type)
+            file_client = directory_client.get_file_client(file_name)
+            create_kwargs = {} if overwrite else {"match_condition": MatchConditions.IfMissing}
+            created = await file_client.create_file(content_settings=content_settings, **create_kwargs)
+            offset = 0
             async with aiofiles.open(local_file_path, mode="rb") as file_data:
-                mime_type = mimetypes.guess_type(local_file_path)[0] or "audio/wav"
-                file_client = directory_client.get_file_client(file_name)
-                data = await file_data.read()
-                logger.info(f"Uploading data for file: {file_name}, size: {len(data)} bytes, mime_type: {mime_type}")
-                await file_client.upload_data(
-                    data,
-                    overwrite=overwrite,
-                    content_settings=ContentSettings(content_type=mime_type),
-                )
-                logger.info(f"File uploaded successfully: {file_name}")
-                return True
+                while True:
+                    await file_slots.acquire()
+                    await budget.acquire()
+                    try:
+                        block = await file_data.read(self.upload_block_size)
+                    except BaseException:
+                        budget.release()
+                        raise
+                    if not block:
+                        budget.release()
+                        break
+                    checksum.update(block)
+                    tasks.append(asyncio.create_task(self._append_block(file_client, block, offset, budget, file_slots, progress)))
+                    offset += len(block)
+            await asyncio.gather(*tasks)
+            logger.debug(f"Uploaded data for file: {file_name}, size: {offset} bytes, blocks: {len(tasks)}, mime_type: {mime_type}")
+            await file_client.flush_data(
+                offset,
+                content_settings=content_settings,
+                etag=created["etag"],
+                match_condition=MatchConditions.IfNotModified,
+            )
+            logger.debug(f"File uploaded successfully: {file_name}")
+            return checksum.hexdigest()
         except Exception as e:
+            for task in tasks:
+                task.cancel()
             logger.error(f"Upload failed for {file_name}: {str(e)}")
             return False
 
     async def list_files(self, storage_url):
-        logger.info(f"Called list_files with storage_url: {storage_url}")
+        logger.debug(f"Called list_files with storage_url: {storage_url}")
         account_url, file_system_name, directory_name, sas_token = self._extract_url_components(storage_url)
-        logger.info(f"Listing files in directory: {directory_name}")
+        logger.debug(f"Listing files in directory: {directory_name}")
+        from azure.storage.filedatalake.aio import FileSystemClient
         file_names = []
         async with FileSystemClient(
             account_url=f"{account_url}?{sas_token}",
@@ -174,266 +344,704 @@ class SarvamBatchTranscriber:
                 file_name = path.name.split("/")[-1]
                 async with self.lock:
                     file_names.append(file_name)
-                logger.info(f"Found file: {file_name}")
-        logger.info(f"Found {len(file_names)} files: {file_names}")
+                logger.debug(f"Found file: {file_name}")
+        logger.info(f"Found {len(file_names)} files in {directory_name}")
         return file_names
 
-    async def download_files(self, storage_url, file_names, destination_dir):
-        logger.info(f"Called download_files with storage_url: {storage_url}, file_names: {file_names}, destination_dir: {destination_dir}")
+    async def download_files(self, storage_url, file_names, destination_dir, progress=None):
+        """
+        Download file_names from storage_url into destination_dir, at most max_concurrent_downloads at a time.
+        Returns the total number of bytes written. progress, a ProgressTracker, learns the size of every
+        file as its download starts and is advanced chunk by chunk.
+        """
+        logger.debug(f"Called download_files with storage_url: {storage_url}, file_names: {file_names}, destination_dir: {destination_dir}")
         account_url, file_system_name, directory_name, sas_token = self._extract_url_components(storage_url)
         logger.info(f"Downloading {len(file_names)} files to {destination_dir}")
+        from azure.storage.filedatalake.aio import DataLakeDirectoryClient
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
         async with DataLakeDirectoryClient(
             account_url=f"{account_url}?{sas_token}",
             file_system_name=file_system_name,
             directory_name=directory_name,
             credential=None,
+            max_single_get_size=self.download_chunk_size,
+            max_chunk_get_size=self.download_chunk_size,
         ) as directory_client:
             tasks = []
             for file_name in file_names:
-                logger.info(f"Preparing to download file: {file_name}")
-                tasks.append(self._download_file(directory_client, file_name, destination_dir))
+                logger.debug(f"Preparing to download file: {file_name}")
+                tasks.append(self._download_file(directory_client, file_name, destination_dir, semaphore, progress))
             results = await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Download completed for {sum(1 for r in results if not isinstance(r, Exception))} files")
+            total_bytes = 0
+            downloaded = 0
             for idx, result in enumerate(results):
                 if isinstance(result, Exception):
                     logger.error(f"Error downloading file {file_names[idx]}: {result}")
+                elif result is not None:
+                    downloaded += 1
+                    total_bytes += result
+            logger.info(f"Download completed for {downloaded}/{len(file_names)} files, {total_bytes} bytes")
+            return total_bytes
 
-    async def _download_file(self, directory_client, file_name, destination_dir):
-        logger.info(f"Called _download_file with file_name: {file_name}, destination_dir: {destination_dir}")
+    async def _download_file(self, directory_client, file_name, destination_dir, semaphore=None, progress=None):
+        """
+        Stream file_name to disk chunk by chunk. Returns the number of bytes written, or None on failure.
+        """
+        logger.debug(f"Called _download_file with file_name: {file_name}, destination_dir: {destination_dir}")
+        import aiofiles
+        download_path = os.path.join(destination_dir, file_name)
         try:
-            file_client = directory_client.get_file_client(file_name)
-            download_path = os.path.join(destination_dir, file_name)
-            async with aiofiles.open(download_path, mode="wb") as file_data:
-                stream = await file_client.download_file()
-                data = await stream.readall()
-                logger.info(f"Writing data to {download_path}, size: {len(data)} bytes")
-                await file_data.write(data)
-            logger.info(f"Downloaded: {file_name} -> {download_path}")
-            return True
+            async with semaphore or contextlib.nullcontext():
+                file_client = directory_client.get_file_client(file_name)
+                written = 0
+                async with aiofiles.open(download_path, mode="wb") as file_data:
+                    stream = await file_client.download_file()
+                    if progress:
+                        progress.expand(stream.size)
+                    async for chunk in stream.chunks():
+                        await file_data.write(chunk)
+                        written += len(chunk)
+                        metrics.inc("download_bytes_total", len(chunk))
+                        if progress:
+                            progress.advance(len(chunk))
+                logger.debug(f"Downloaded: {file_name} -> {download_path}, size: {written} bytes")
+                return written
         except Exception as e:
             logger.error(f"Download failed for {file_name}: {str(e)}")
-            return False
+            try:
+                if os.path.exists(download_path):
+                    os.remove(download_path)
+            except OSError as cleanup_err:
+                logger.warning(f"Failed to remove partial download {download_path}: {cleanup_err}")
+            return None
 
     def split_audio(self, audio_path, chunk_duration_ms, output_dir):
-        logger.info(f"Called split_audio with audio_path: {audio_path}, chunk_duration_ms: {chunk_duration_ms}, output_dir: {output_dir}")
-        chunk_duration = chunk_duration_ms / 1000  # convert ms to seconds
-        audio = editor.AudioFileClip(audio_path)
-        duration = int(audio.duration)
-        logger.info(f"Audio duration: {duration} seconds")
-        base = os.path.splitext(os.path.basename(audio_path))[0]
-        chunk_paths = []
-        idx = 0
-        for i in range(0, duration, int(chunk_duration)):
-            start = i
-            end = min(i + int(chunk_duration), duration)
-            logger.info(f"Creating chunk from {start} to {end}")
-            chunk = audio.subclip(start, end)
-            logger.debug(f"Created chunk: type={type(chunk)}, duration={chunk.duration}, has_reader={hasattr(chunk, 'reader') and chunk.reader is not None}")
-            chunk_path = os.path.join(output_dir, f"{base}_chunk_{idx+1}.wav")
-            logger.info(f"Exporting chunk {idx+1} to {chunk_path}")
-            logger.debug(f"About to write chunk: idx={idx+1}, type={type(chunk)}, duration={chunk.duration}, has_reader={hasattr(chunk, 'reader') and chunk.reader is not None}")
-            try:
-                chunk.write_audiofile(chunk_path)
-                logger.debug(f"Successfully wrote chunk {idx+1} to {chunk_path}")
-            except Exception as e:
-                logger.error(f"Exception while writing chunk {idx+1} to {chunk_path}: {e}")
-                logger.error(f"Chunk state: type={type(chunk)}, duration={getattr(chunk, 'duration', None)}, has_reader={hasattr(chunk, 'reader') and chunk.reader is not None}")
-                raise
-            chunk_paths.append(chunk_path)
-            idx += 1
-        audio.close()
-        logger.info(f"Total chunks created and written: {len(chunk_paths)}")
-        return chunk_paths
+        logger.debug(f"Called split_audio with audio_path: {audio_path}, chunk_duration_ms: {chunk_duration_ms}, output_dir: {output_dir}")
+        return [chunk.path for chunk in self.split_audio_chunks(audio_path, chunk_duration_ms, output_dir)]
 
-    async def transcribe_batch(self, local_files, destination_dir, chunk_duration_ms=60*60*1000, progress_callback=None):
-        logger.info(f"Called transcribe_batch with local_files: {local_files}, destination_dir: {destination_dir}, chunk_duration_ms: {chunk_duration_ms}")
-        # Step 1: Initialize the job
-        job_info = await self.initialize_job()
-        if not job_info:
-            logger.error("Job initialization failed")
-            if progress_callback:
-                progress_callback("Job initialization failed")
-            return
-        job_id = job_info["job_id"]
-        input_storage_path = job_info["input_storage_path"]
-        output_storage_path = job_info["output_storage_path"]
+    def split_audio_chunks(self, audio_path, chunk_duration_ms, output_dir):
+        """
+        Like split_audio, but returns segmenter.Chunk tuples carrying each chunk's exact start and end offset in seconds.
+        All chunks are produced in one ffmpeg pass, stream-copied when stream_copy_chunks is set and the codec allows it.
+        With encode_workers > 1 the chunks are encoded in parallel, one ffmpeg process per chunk.
+        With silence_aware_chunks or strip_silence the cuts are moved into silences (see silence.split_on_silence).
+        Chunks are encoded with the upload profile when one is set.
+        """
+        base = os.path.splitext(os.path.basename(audio_path))[0]
+        if self.silence_aware_chunks or self.strip_silence:
+            from .silence import split_on_silence
+            return split_on_silence(audio_path, chunk_duration_ms / 1000, output_dir, base, strip_silence=self.strip_silence,
+                                    profile=self.upload_profile)
+        if self.encode_workers > 1:
+            return segment_audio_parallel(audio_path, chunk_duration_ms / 1000, output_dir, base,
+                                          stream_copy=self.stream_copy_chunks, workers=self.encode_workers,
+                                          profile=self.upload_profile)
+        return segment_audio(audio_path, chunk_duration_ms / 1000, output_dir, base, stream_copy=self.stream_copy_chunks,
+                             profile=self.upload_profile)
 
-        # Step 2: Upload files (split if needed)
+    def _prepare_upload_files(self, local_files, chunk_duration_ms, destination_dir, progress=None):
+        """
+        Split any file longer than chunk_duration_ms into chunks and encode the rest with the upload profile
+        unless they already match it.
+        Returns (files_to_upload, chunked_files, source_names, total_duration, chunk_offsets) where chunked_files
+        are the temporary files written for the upload, source_names maps each local file to the ordered base names
+        of the files uploaded for it, total_duration is in seconds and chunk_offsets maps the base name of every
+        chunk to its [start, end, offsets] on the source timeline (see segmenter.Chunk).
+        progress, a ProgressTracker, is advanced by the size of every local file once it is prepared.
+        """
         files_to_upload = []
-        chunked_files = []  # Track chunked files for cleanup
+        chunked_files = []  # Track chunked and transcoded files for cleanup
+        source_names = {}
+        chunk_offsets = {}
+        total_duration = 0
         for file in local_files:
-            logger.info(f"Processing file: {file}")
-            audio = editor.AudioFileClip(file)
-            logger.debug(f"Created AudioFileClip: type={type(audio)}, duration={audio.duration}, has_reader={hasattr(audio, 'reader') and audio.reader is not None}")
-            logger.info(f"Audio duration (s): {audio.duration}")
-            if audio.duration * 1000 > chunk_duration_ms:
-                chunk_paths = self.split_audio(file, chunk_duration_ms, destination_dir)
+            logger.debug(f"Processing file: {file}")
+            with metrics.span("probe"):
+                duration = get_audio_info(file)["duration"]
+            if duration is None:
+                raise ValueError(f"Could not read the duration of audio file: {file}")
+            metrics.inc("audio_seconds_total", duration)
+            logger.debug(f"Audio duration (s): {duration}")
+            total_duration += duration
+            if duration * 1000 > chunk_duration_ms or self.strip_silence:
+                with metrics.span("split"):
+                    chunks = self.split_audio_chunks(file, chunk_duration_ms, destination_dir)
+                chunk_paths = [chunk.path for chunk in chunks]
+                for chunk in chunks:
+                    chunk_offsets[os.path.splitext(os.path.basename(chunk.path))[0]] = [chunk.start, chunk.end, [list(o) for o in chunk.offsets]]
                 files_to_upload.extend(chunk_paths)
                 chunked_files.extend(chunk_paths)
+                uploaded = chunk_paths
+            elif self.upload_profile and not self.upload_profile.matches(get_audio_info(file)):
+                with metrics.span("encode"):
+                    encoded_path = transcode_audio(file, destination_dir, self.upload_profile)
+                if os.path.getsize(encoded_path) < os.path.getsize(file):
+                    files_to_upload.append(encoded_path)
+                    chunked_files.append(encoded_path)
+                    uploaded = [encoded_path]
+                else:
+                    # Already compressed tighter than the profile (e.g. a low bitrate source and FLAC)
+                    logger.debug(f"Uploading {file} as-is: it is smaller than its {self.upload_profile.name} encoding")
+                    os.remove(encoded_path)
+                    files_to_upload.append(file)
+                    uploaded = [file]
             else:
                 files_to_upload.append(file)
-            audio.close()
-            logger.debug(f"Closed AudioFileClip for file: {file}")
-            logger.info(f"Finished processing file: {file}")
+                uploaded = [file]
+            source_names[file] = [os.path.splitext(os.path.basename(f))[0] for f in uploaded]
+            if progress:
+                progress.advance(os.path.getsize(file))
+            logger.debug(f"Finished processing file: {file}")
+        return files_to_upload, chunked_files, source_names, total_duration, chunk_offsets
 
-        if progress_callback:
-            progress_callback("Uploading files...")
-        logger.info(f"Uploading files: {files_to_upload}")
-        await self.upload_files(input_storage_path, files_to_upload)
+    def _upload_stats(self, local_files, files_to_upload, cached_files):
+        """Byte counts of a prepared batch: the source audio, what was prepared from it and what actually goes over the wire."""
+        source_bytes = sum(os.path.getsize(f) for f in local_files if os.path.exists(f))
+        prepared_bytes = sum(os.path.getsize(f) for f in files_to_upload if os.path.exists(f))
+        upload_bytes = sum(os.path.getsize(f) for f in files_to_upload if f not in cached_files and os.path.exists(f))
+        logger.info(f"Prepared {prepared_bytes / 1024 / 1024:.1f} MB for upload from {source_bytes / 1024 / 1024:.1f} MB of source audio "
+                    f"(profile: {self.upload_profile.name if self.upload_profile else 'source'}, "
+                    f"saved {(source_bytes - prepared_bytes) / 1024 / 1024:.1f} MB); {upload_bytes / 1024 / 1024:.1f} MB not cached")
+        return {
+            "source_bytes": source_bytes,
+            "prepared_bytes": prepared_bytes,
+            "upload_bytes": upload_bytes,
+            "bytes_saved": source_bytes - prepared_bytes,
+        }
 
-        # Clean up chunked files after upload
+    def _batch_result(self, job_id, job_state, local_files, destination_dir, transcripts=(), journal=None, upload_stats=None):
+        return {
+            "job_id": job_id,
+            "job_state": job_state,
+            "local_files": list(local_files),
+            "destination_dir": destination_dir,
+            "transcripts": list(transcripts),
+            "journal": journal,
+            "upload_stats": upload_stats,
+        }
+
+    def _lookup_cached_sources(self, local_files, chunk_duration_ms):
+        """
+        Look local_files up in the transcript cache by their content, before anything is prepared for them.
+        Returns (source cache keys by local file, cached chunks by local file) where the cached chunks of a source
+        are the [base name suffix, cache key, offsets] of every file uploaded for it by an earlier run.
+        """
+        settings = f"{self.upload_profile.name if self.upload_profile else 'source'}|{chunk_duration_ms}|" \
+                   f"{self.silence_aware_chunks}|{self.strip_silence}"
+        source_keys = {}
+        cached_sources = {}
+        for path in local_files:
+            try:
+                key = self.transcript_cache.source_key(path, self.language_code, settings)
+            except OSError as e:
+                logger.warning(f"Failed to hash {path} for the transcript cache: {e}")
+                continue
+            source_keys[path] = key
+            chunks = (self.transcript_cache.get(key) or {}).get("chunks")
+            # Only usable while the result of every chunk is still cached
+            if chunks and all(self.transcript_cache.get(chunk_key) is not None for _, chunk_key, _ in chunks):
+                cached_sources[path] = chunks
+        logger.info(f"Transcript cache hits: {len(cached_sources)}/{len(local_files)} source files")
+        return source_keys, cached_sources
+
+    def _cache_sources(self, state, results):
+        """Record the cache keys of the chunk results of every source transcribed in full, for _lookup_cached_sources."""
+        cached_sources = state.get("cached_sources") or []
+        for local_file, key in (state.get("source_keys") or {}).items():
+            source_base = os.path.splitext(os.path.basename(local_file))[0]
+            bases = state["source_names"].get(local_file) or []
+            if local_file in cached_sources or not bases or any(
+                    base not in results or not state["cache_keys"].get(base) or not base.startswith(source_base) for base in bases):
+                continue
+            self.transcript_cache.put(key, {"chunks": [[base[len(source_base):], state["cache_keys"][base], state["chunk_offsets"].get(base)]
+                                                       for base in bases]})
+
+    def _lookup_cached_transcripts(self, files_to_upload):
+        """
+        Compute the transcript cache key of every file to upload.
+        Returns (cache_keys by base name, list of files whose transcript is already cached).
+        """
+        cache_keys = {}
+        cached_files = []
+        for path in files_to_upload:
+            base = os.path.splitext(os.path.basename(path))[0]
+            try:
+                key = self.transcript_cache.audio_key(path, self.language_code)
+            except Exception as e:
+                logger.warning(f"Failed to hash {path} for the transcript cache: {e}")
+                continue
+            cache_keys[base] = key
+            if self.transcript_cache.get(key) is not None:
+                cached_files.append(path)
+        logger.info(f"Transcript cache hits: {len(cached_files)}/{len(files_to_upload)} files")
+        return cache_keys, cached_files
+
+    def _load_results(self, state):
+        """
+        Parse every downloaded {file_id}.json once and add it to the transcript cache; take the results of
+        the cached files straight from the cache. Returns (results by upload base name, downloaded JSON paths).
+        """
+        destination_dir = state["destination_dir"]
+        cache_keys = state["cache_keys"]
+        results = {}
+        json_paths = []
+        for file_id, file_name in state["file_id_name_map"].items():
+            base = os.path.splitext(file_name)[0]
+            json_path = os.path.join(destination_dir, file_id + ".json")
+            if not os.path.exists(json_path):
+                logger.warning(f"No result was downloaded for {file_name}")
+                continue
+            json_paths.append(json_path)
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    results[base] = json.load(f)
+            except ValueError as e:
+                logger.error(f"Failed to parse {json_path}: {e}")
+                continue
+            if self.transcript_cache and cache_keys.get(base):
+                self.transcript_cache.put(cache_keys[base], results[base])
+        cached_bases = [os.path.splitext(os.path.basename(path))[0] for path in state["cached_files"]]
+        cached_bases += [base for local_file in state.get("cached_sources") or [] for base in state["source_names"][local_file]]
+        for base in cached_bases:
+            result = self.transcript_cache.get(cache_keys[base]) if self.transcript_cache and base in cache_keys else None
+            if result is None:
+                logger.warning(f"Cached transcript for {base} is no longer available")
+                continue
+            results[base] = result
+        return results, json_paths
+
+    def _remove_chunk_files(self, chunked_files):
         for chunk_file in chunked_files:
+            if not os.path.exists(chunk_file):
+                continue
             try:
                 os.remove(chunk_file)
-                logger.info(f"Deleted chunked file: {chunk_file}")
+                logger.debug(f"Deleted chunked file: {chunk_file}")
             except Exception as e:
                 logger.warning(f"Failed to delete chunked file {chunk_file}: {e}")
 
+    def _pending_uploads(self, journal, remote_files):
+        """Return the files of remote_files that were not uploaded yet, or whose content changed since."""
+        uploaded = journal.state["uploaded"]
+        pending = []
+        for path in remote_files:
+            if path not in uploaded:
+                pending.append(path)
+            elif os.path.exists(path) and file_checksum(path) != uploaded[path]:
+                logger.info(f"{path} changed since it was uploaded; uploading it again")
+                pending.append(path)
+        return pending
+
+    async def _run_remote_job(self, journal, remote_files, progress_callback=None):
+        """
+        Take the Sarvam job recorded in journal through init, upload, start, status polling and download,
+        skipping the steps the journal says are already done. Chunked files are deleted once uploaded.
+        Returns the final job state: "Completed" once the outputs are downloaded, else the state it stopped at.
+        """
+        state = journal.state
+        # Step 1: Initialize the job
+        if not journal.reached("initialized"):
+            with metrics.span("init"):
+                job_info = await self.initialize_job()
+            if not job_info:
+                logger.error("Job initialization failed")
+                if progress_callback:
+                    progress_callback("Job initialization failed")
+                return "Failed"
+            journal.advance(
+                "initialized",
+                job_id=job_info["job_id"],
+                input_storage_path=job_info["input_storage_path"],
+                output_storage_path=job_info["output_storage_path"],
+            )
+        job_id = state["job_id"]
+
+        # Step 2: Upload files
+        if not journal.reached("uploaded"):
+            pending = self._pending_uploads(journal, remote_files)
+            if progress_callback:
+                progress_callback("Uploading files...")
+            logger.debug(f"Uploading files: {pending}")
+            progress = self._progress_tracker(progress_callback, "upload", sum(os.path.getsize(f) for f in pending if os.path.exists(f)))
+            with metrics.span("upload"):
+                uploaded = await self.upload_files(state["input_storage_path"], pending, progress=progress)
+            if progress:
+                progress.finish()
+            failed = [path for path in pending if path not in uploaded]
+            if failed:
+                # Starting now would leave gaps in the transcripts: keep the chunks and the journal so resume_job
+                # uploads just the files that are missing
+                journal.update(uploaded={**state["uploaded"], **uploaded})
+                logger.error(f"Failed to upload {len(failed)}/{len(pending)} files: {failed}")
+                if progress_callback:
+                    progress_callback(f"Failed to upload {len(failed)} files; the job can be resumed")
+                return "UploadIncomplete"
+            journal.advance("uploaded", uploaded={**state["uploaded"], **uploaded})
+            # Clean up chunked files after upload
+            self._remove_chunk_files(state["chunked_files"])
+
         # Step 3: Start the job
-        if progress_callback:
-            progress_callback("Starting job...")
-        logger.info(f"Starting job with job_id: {job_id}")
-        job_start_response = await self.start_job(job_id)
-        if not job_start_response:
-            logger.error("Failed to start job")
+        if not journal.reached("started"):
             if progress_callback:
-                progress_callback("Failed to start job")
-            return
+                progress_callback("Starting job...")
+            logger.info(f"Starting job with job_id: {job_id}")
+            with metrics.span("start"):
+                job_start_response = await self.start_job(job_id)
+            if not job_start_response:
+                logger.error("Failed to start job")
+                if progress_callback:
+                    progress_callback("Failed to start job")
+                return "Failed"
+            journal.advance("started")
 
         # Step 4: Monitor job status
-        logger.info("Monitoring job status...")
-        attempt = 1
-        status = None
-        while True:
-            logger.info(f"Status check attempt {attempt}")
-            job_status = await self.check_job_status(job_id)
+        if not journal.reached("completed"):
+            logger.info("Monitoring job status...")
+
+            # Split the wait into time queued at Sarvam and time spent processing (from the first "Running" status)
+            wait_started = time.perf_counter()
+            running_since = []
+
+            def on_status(job_state):
+                logger.info(f"Current job status: {job_state}")
+                if job_state == "Running" and not running_since:
+                    running_since.append(time.perf_counter())
+                    metrics.observe("stage_seconds", running_since[0] - wait_started, stage="queue_wait", outcome="ok")
+                if progress_callback:
+                    progress_callback(f"Job status: {job_state}")
+
+            try:
+                with metrics.span("remote_job"):
+                    job_status = await self.poller.wait(job_id, state["total_duration"], on_status=on_status)
+            except asyncio.TimeoutError:
+                logger.error(f"Timed out waiting for job {job_id}")
+                if progress_callback:
+                    progress_callback("Timed out waiting for job")
+                journal.update(job_state="TimedOut")
+                return "TimedOut"
             if not job_status:
                 logger.error("Failed to get job status")
                 if progress_callback:
                     progress_callback("Failed to get job status")
-                break
+                return None
             status = job_status["job_state"]
-            logger.info(f"Current job status: {status}")
-            if progress_callback:
-                progress_callback(f"Job status: {status}")
-            if status == "Completed":
-                logger.info("Job completed successfully!")
-                break
-            elif status == "Failed":
+            if running_since:
+                metrics.observe("stage_seconds", time.perf_counter() - running_since[0], stage="processing",
+                                outcome="ok" if status == "Completed" else "error")
+            journal.update(job_state=status)
+            if status != "Completed":
                 logger.error("Job failed!")
-                break
-            else:
-                logger.info(f"Current status: {status}")
-                await asyncio.sleep(10)
-            attempt += 1
+                return status
+            logger.info("Job completed successfully!")
+            # The terminal status maps the output file ids to the uploaded files
+            journal.advance("completed", job_details=job_status.get("job_details") or [])
 
         # Step 5: Download results
-        if status == "Completed":
-            if progress_callback:
-                progress_callback("Downloading results...")
-            logger.info(f"Downloading results from: {output_storage_path}")
+        if progress_callback:
+            progress_callback("Downloading results...")
+        output_storage_path = state["output_storage_path"]
+        logger.info(f"Downloading results from: {output_storage_path}")
+        progress = self._progress_tracker(progress_callback, "download")
+        with metrics.span("download"):
             files = await self.list_files(output_storage_path)
-            os.makedirs(destination_dir, exist_ok=True)
-            await self.download_files(output_storage_path, files, destination_dir)
-            logger.info(f"Files have been downloaded to: {destination_dir}")
-            # Fetch job status again to get file_id to file_name mapping
-            job_status = await self.check_job_status(job_id)
-            file_id_name_map = {}
-            if job_status and 'job_details' in job_status:
-                for detail in job_status['job_details']:
-                    file_id = str(detail.get('file_id'))
-                    file_name = detail.get('file_name')
-                    if file_id and file_name:
-                        file_id_name_map[file_id] = file_name
+            downloaded_bytes = await self.download_files(output_storage_path, files, state["destination_dir"], progress=progress)
+        if progress:
+            progress.finish()
+        logger.info(f"Files have been downloaded to: {state['destination_dir']} ({downloaded_bytes} bytes)")
+        file_id_name_map, unmapped = await self._map_result_files(job_id, files, state.get("job_details"))
+        missing = [f for f in files if not os.path.exists(os.path.join(state["destination_dir"], f))]
+        if not files or missing or unmapped:
+            # Finishing now would write empty or partial transcripts; keep the journal so the download is retried
+            logger.error(f"Results of job {job_id} are incomplete: {len(files)} listed, not downloaded: {missing}, "
+                         f"no file name for ids: {unmapped}")
             if progress_callback:
-                progress_callback("Transcription complete!")
-            # Post-process: convert downloaded .json transcripts to .txt with correct names
-            self._convert_json_transcripts_to_txt(destination_dir, file_id_name_map)
+                progress_callback("Could not fetch all results; the job can be resumed")
+            return "DownloadIncomplete"
+        journal.advance("downloaded", file_id_name_map=file_id_name_map, downloaded=files)
+        return "Completed"
 
-            # Remove any audio files from the destination directory
-            for f in os.listdir(destination_dir):
-                if f.lower().endswith((".wav", ".mp3", ".m4a", ".aac", ".ogg")):
-                    try:
-                        os.remove(os.path.join(destination_dir, f))
-                        logger.info(f"Deleted audio file from transcripts folder: {f}")
-                    except Exception as e:
-                        logger.warning(f"Failed to delete audio file {f}: {e}")
-
-            # Merge all .txt transcripts into a single file
-            # Get the base name of the original audio file (before chunking)
-            if local_files:
-                original_base = os.path.splitext(os.path.basename(local_files[0]))[0]
+    async def _map_result_files(self, job_id, file_names, job_details=None, attempts=3, backoff=2.0):
+        """
+        Map the file id of every downloaded {file_id}.json in file_names to the name of the uploaded file it is
+        the result of, from job_details (of the terminal job status) or else from status calls retried with backoff.
+        Returns (file_id_name_map, ids that could not be mapped).
+        """
+        file_ids = [os.path.splitext(name)[0] for name in file_names if name.endswith(".json")]
+        for attempt in range(attempts + 1):
+            file_id_name_map = {}
+            for detail in job_details or []:
+                file_id = detail.get("file_id")
+                file_name = detail.get("file_name")
+                if file_id is not None and file_name:
+                    file_id_name_map[str(file_id)] = file_name
+            unmapped = [file_id for file_id in file_ids if file_id not in file_id_name_map]
+            if not unmapped or attempt == attempts:
+                return file_id_name_map, unmapped
+            if attempt:
+                await asyncio.sleep(backoff * 2 ** (attempt - 1))
+            job_status = await self.check_job_status(job_id)
+            job_details = (job_status or {}).get("job_details")
+
+    def _finish_batch(self, journal, progress_callback=None):
+        """Turn the downloaded and cached results into one merged transcript per local file. Returns the transcript paths."""
+        state = journal.state
+        destination_dir = state["destination_dir"]
+        if progress_callback:
+            progress_callback("Transcription complete!")
+        results, json_paths = self._load_results(state)
+        if self.transcript_cache:
+            self._cache_sources(state, results)
+
+        # Stream the results of each original audio file (before chunking), in chunk order and with the
+        # chunk timestamps shifted onto its timeline, into one transcript per output format
+        chunk_offsets = state.get("chunk_offsets") or {}
+        transcripts = []
+        for local_file in state["local_files"]:
+            original_base = os.path.splitext(os.path.basename(local_file))[0]
+            bases = state["source_names"].get(local_file) or sorted((b for b in results if b.startswith(original_base)), key=natural_key)
+            writer = TranscriptWriter(destination_dir, original_base, self.output_formats)
+            try:
+                for base in bases:
+                    if base not in results:
+                        logger.warning(f"No transcript for {base}; it is missing from {original_base}")
+                        continue
+                    chunk = None
+                    if base in chunk_offsets:
+                        start, end, offsets = chunk_offsets[base]
+                        chunk = Chunk(base, start, end, tuple(tuple(o) for o in offsets))
+                    writer.write_result(results[base], chunk, source=base)
+            finally:
+                transcripts.extend(writer.close())
+
+        for json_path in json_paths:
+            try:
+                os.remove(json_path)
+            except OSError as e:
+                logger.warning(f"Failed to delete {json_path}: {e}")
+        if state.get("publish_dir"):
+            transcripts = self._publish_transcripts(transcripts, state["publish_dir"])
+        if self.search_index:
+            index_transcripts(transcripts)
+        return [path for path in transcripts if os.path.exists(path)]
+
+    def _publish_transcripts(self, transcripts, publish_dir):
+        """Move transcripts into publish_dir with merge.publish_transcript (appending TXT and JSONL, replacing SRT and VTT)."""
+        published = []
+        # The JSONL goes first: a new one is seeded from the published TXT, which must not hold this run yet
+        for staged_path in sorted(transcripts, key=lambda path: not path.endswith(".jsonl")):
+            if not os.path.exists(staged_path):
+                continue
+            final_path = os.path.join(publish_dir, os.path.basename(staged_path))
+            publish_transcript(staged_path, final_path)
+            published.append(final_path)
+        return published
+
+    async def _run_journaled(self, journal, progress_callback=None):
+        """
+        Run (or resume) the batch transcription described by journal from its first unfinished step.
+        If it raises before a Sarvam job was initialized there is nothing to resume and the journal is removed;
+        later the journal is kept (with the error) so resume_job can continue the job.
+        """
+        try:
+            return await self._run_journal_steps(journal, progress_callback)
+        except Exception as e:
+            if journal.reached("initialized"):
+                logger.error(f"Batch job {journal.state['job_id']} stopped at step {journal.state['step']}: {e!r}; it can be resumed")
+                journal.update(error=repr(e))
             else:
-                original_base = "merged_transcript"
-            self._merge_transcripts(destination_dir, file_id_name_map, original_base)
-
-    def _convert_json_transcripts_to_txt(self, directory, file_id_name_map=None):
-        """
-        For each .json file in the directory, extract the 'transcript' key and save as a .txt file named after the original audio file.
-        """
-        for filename in os.listdir(directory):
-            if filename.endswith('.json'):
-                json_path = os.path.join(directory, filename)
-                file_id = os.path.splitext(filename)[0]
-                # Default to file_id.txt if mapping not found
-                base_name = file_id_name_map.get(file_id) if file_id_name_map else None
-                if base_name:
-                    base_name = os.path.splitext(base_name)[0]  # Remove extension
-                    txt_path = os.path.join(directory, base_name + '.txt')
-                else:
-                    txt_path = os.path.join(directory, file_id + '.txt')
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    transcript = data.get('transcript')
-                    if transcript:
-                        with open(txt_path, 'w', encoding='utf-8') as f:
-                            f.write(transcript)
-                        logger.info(f"Extracted transcript to {txt_path}")
-                        os.remove(json_path)
-                        logger.info(f"Deleted original JSON file: {json_path}")
-                    else:
-                        logger.warning(f"No 'transcript' key found in {json_path}")
-                except Exception as e:
-                    logger.error(f"Failed to convert {json_path} to txt: {e}")
-
-    def _merge_transcripts(self, directory, file_id_name_map=None, merged_base_name="merged_transcript"):
-        """
-        Merge all .txt transcript files in the directory into a single merged transcript file named after the original audio file.
-        The order is based on the original audio file and chunk index if possible.
-        If the merged file already exists, append new transcripts with a separator and timestamp.
-        """
-        txt_files = [f for f in os.listdir(directory) if f.endswith('.txt') and f != f'{merged_base_name}.txt']
-        # Try to order by file_id_name_map if available, else by filename
-        ordered_files = []
-        if file_id_name_map:
-            # Build a mapping from base_name to txt filename
-            base_to_txt = {os.path.splitext(v)[0]: k + '.txt' for k, v in file_id_name_map.items()}
-            for base in sorted(base_to_txt.keys()):
-                txt_file = base_to_txt[base]
-                if txt_file in txt_files:
-                    ordered_files.append(txt_file)
-            # Add any remaining txt files not in mapping
-            for f in txt_files:
-                if f not in ordered_files:
-                    ordered_files.append(f)
-        else:
-            ordered_files = sorted(txt_files)
-        merged_path = os.path.join(directory, f'{merged_base_name}.txt')
-        # Determine mode: append if file exists, else write
-        mode = 'a' if os.path.exists(merged_path) else 'w'
-        with open(merged_path, mode, encoding='utf-8') as outfile:
-            for fname in ordered_files:
-                file_path = os.path.join(directory, fname)
-                with open(file_path, 'r', encoding='utf-8') as infile:
-                    outfile.write(infile.read())
-                    outfile.write("\n")
-        logger.info(f"Merged {len(ordered_files)} transcripts into {merged_path}")
-        # Delete individual transcript files except the merged one
-        for fname in txt_files:
-            if fname != f'{merged_base_name}.txt':
-                try:
-                    os.remove(os.path.join(directory, fname))
-                    logger.info(f"Deleted individual transcript file: {fname}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete transcript file {fname}: {e}")
+                logger.error(f"Batch transcription of {journal.state['local_files']} failed: {e!r}")
+                journal.remove()
+            raise
+        finally:
+            # Chunks are no longer needed once uploaded or once the run is over (also those served from the
+            # cache); an upload that can still be resumed keeps them
+            if journal.reached("uploaded") or not os.path.exists(journal.path):
+                self._remove_chunk_files(journal.state["chunked_files"])
+
+    async def _run_journal_steps(self, journal, progress_callback=None):
+        state = journal.state
+        local_files = state["local_files"]
+        destination_dir = state["destination_dir"]
+        os.makedirs(destination_dir, exist_ok=True)
+
+        # Split files if needed; again on resume if chunks that still have to be uploaded were lost
+        pending = [f for f in state["files_to_upload"] or [] if f not in state["cached_files"] and f not in state["uploaded"]]
+        if not journal.reached("prepared") or (not journal.reached("uploaded") and any(not os.path.exists(f) for f in pending)):
+            # Sources transcribed before are looked up by their bytes first, so they are neither encoded nor chunked again
+            source_keys, cached_sources = {}, {}
+            if self.transcript_cache:
+                if progress_callback:
+                    progress_callback("Checking transcript cache...")
+                with metrics.span("cache_lookup"):
+                    source_keys, cached_sources = await asyncio.to_thread(self._lookup_cached_sources, local_files,
+                                                                          state["chunk_duration_ms"])
+            to_prepare = [f for f in local_files if f not in cached_sources]
+            progress = self._progress_tracker(progress_callback, "prepare", sum(os.path.getsize(f) for f in to_prepare if os.path.exists(f)))
+            files_to_upload, chunked_files, source_names, total_duration, chunk_offsets = await asyncio.to_thread(
+                self._prepare_upload_files, to_prepare, state["chunk_duration_ms"], destination_dir, progress
+            )
+            if progress:
+                progress.finish()
+            cache_keys, cached_files = {}, []
+            if self.transcript_cache and files_to_upload:
+                with metrics.span("cache_lookup"):
+                    cache_keys, cached_files = await asyncio.to_thread(self._lookup_cached_transcripts, files_to_upload)
+            for local_file, chunks in cached_sources.items():
+                source_base = os.path.splitext(os.path.basename(local_file))[0]
+                source_names[local_file] = [source_base + suffix for suffix, _, _ in chunks]
+                for suffix, chunk_key, offsets in chunks:
+                    cache_keys[source_base + suffix] = chunk_key
+                    if offsets is not None:
+                        chunk_offsets[source_base + suffix] = offsets
+            journal.advance(
+                "prepared",
+                files_to_upload=files_to_upload,
+                chunked_files=chunked_files,
+                source_names=source_names,
+                total_duration=total_duration,
+                chunk_offsets=chunk_offsets,
+                cache_keys=cache_keys,
+                cached_files=cached_files,
+                source_keys=source_keys,
+                cached_sources=list(cached_sources),
+                upload_stats=self._upload_stats(to_prepare, files_to_upload, cached_files),
+            )
+
+        remote_files = [f for f in state["files_to_upload"] if f not in state["cached_files"]]
+        status = "Completed"
+        if remote_files and not journal.reached("downloaded"):
+            status = await self._run_remote_job(journal, remote_files, progress_callback)
+
+        if status != "Completed":
+            metrics.inc("jobs_total", state=status)
+            if status == "Failed":
+                journal.remove()
+                return self._batch_result(state["job_id"], status, local_files, destination_dir,
+                                          upload_stats=state.get("upload_stats"))
+            # The job may still finish: keep the journal so resume_job can pick it up with a status call
+            return self._batch_result(state["job_id"], status, local_files, destination_dir, journal=journal.path,
+                                      upload_stats=state.get("upload_stats"))
+
+        with metrics.span("merge"):
+            transcripts = self._finish_batch(journal, progress_callback)
+        journal.advance("done", job_state="Completed")
+        metrics.inc("jobs_total", state="Completed")
+        journal.remove()
+        if state.get("publish_dir"):
+            shutil.rmtree(destination_dir, ignore_errors=True)
+        return self._batch_result(state["job_id"], "Completed", local_files, state.get("publish_dir") or destination_dir, transcripts,
+                                  upload_stats=state.get("upload_stats"))
+
+    async def transcribe_batch(self, local_files, destination_dir, chunk_duration_ms=60*60*1000, progress_callback=None):
+        """
+        Run a single Sarvam batch job over local_files and write one merged transcript per file into destination_dir,
+        as {base}.txt plus .srt, .vtt and .jsonl with timestamps on the file's own timeline (see output_formats).
+        Files whose transcript is already in the transcript cache are not uploaded, and files transcribed before with the
+        same settings are not even prepared (they are looked up by their bytes); if every file is cached no job is run.
+        Progress is recorded in a job journal so an interrupted run can be continued with resume_job.
+        Returns a dict with the job_id (None if no job was needed), final job_state, local_files, destination_dir,
+        the merged transcripts, the journal path if the run can still be resumed and the upload_stats of the batch
+        (source_bytes, prepared_bytes, upload_bytes and bytes_saved by the upload profile).
+        progress_callback gets status strings, plus progress.ProgressEvents with the bytes done and total, rate and
+        ETA of the prepare, upload and download stages, at most one per progress_interval per stage. It may be
+        called from worker threads.
+        """
+        logger.debug(f"Called transcribe_batch with local_files: {local_files}, destination_dir: {destination_dir}, chunk_duration_ms: {chunk_duration_ms}")
+        journal = JobJournal.create(local_files, destination_dir, chunk_duration_ms, self.language_code, self.journal_dir)
+        return await self._run_journaled(journal, progress_callback)
+
+    async def resume_job(self, journal_path, progress_callback=None):
+        """
+        Continue the batch transcription recorded in journal_path from its first unfinished step:
+        a run that died while the job was processing costs one status call instead of a new upload.
+        Returns the same result dict as transcribe_batch.
+        """
+        journal = JobJournal.load(journal_path)
+        logger.info(f"Resuming job journal {journal_path} at step {journal.state['step']} (job_id: {journal.state['job_id']})")
+        if journal.state["language_code"] != self.language_code:
+            logger.warning(f"Journal was created for language {journal.state['language_code']}, resuming with {self.language_code}")
+        return await self._run_journaled(journal, progress_callback)
+
+    async def resume_pending(self, progress_callback=None):
+        """Resume every unfinished batch transcription in the journal directory, oldest first. Returns their results."""
+        results = []
+        for journal in JobJournal.list_pending(self.journal_dir):
+            try:
+                results.append(await self.resume_job(journal.path, progress_callback))
+            except Exception as e:
+                # One broken journal must not keep the others from being resumed
+                logger.error(f"Resuming job journal {journal.path} failed: {e!r}")
+                result = self._batch_result(journal.state["job_id"], "Failed", journal.state["local_files"],
+                                            journal.state.get("publish_dir") or journal.state["destination_dir"],
+                                            journal=journal.path if os.path.exists(journal.path) else None)
+                result["error"] = str(e)
+                results.append(result)
+        return results
+
+    async def transcribe_batch_isolated(self, local_files, destination_dir, chunk_duration_ms=60*60*1000, progress_callback=None):
+        """
+        Like transcribe_batch, but run the batch in a private staging directory inside destination_dir so
+        concurrent jobs never see each other's intermediate files, then move the merged transcripts into
+        destination_dir. Never raises: errors give a "Failed" result with an "error" message, and the
+        result names the journal if the job can still be resumed with resume_job.
+        """
+        staging_dir = tempfile.mkdtemp(prefix=".job_", dir=destination_dir)
+        result = None
+        journal = None
+        try:
+            journal = JobJournal.create(local_files, staging_dir, chunk_duration_ms, self.language_code, self.journal_dir,
+                                        publish_dir=os.path.abspath(destination_dir))
+            result = await self._run_journaled(journal, progress_callback)
+            return result
+        except Exception as e:
+            logger.error(f"Batch job for {local_files} failed: {e}")
+            # _run_journaled keeps the journal only if the Sarvam job can still be resumed
+            resumable = journal is not None and os.path.exists(journal.path)
+            result = self._batch_result(journal.state["job_id"] if journal else None, "Failed", local_files, destination_dir,
+                                        journal=journal.path if resumable else None)
+            result["error"] = str(e)
+            return result
+        finally:
+            # Keep the staging directory of a run that can still be resumed, including one that was cancelled
+            if result is None:
+                resumable = journal is not None and os.path.exists(journal.path)
+            else:
+                resumable = bool(result["journal"])
+            if not resumable:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+    async def transcribe_many(self, local_files, destination_dir, files_per_job=20, max_concurrent_jobs=4,
+                              chunk_duration_ms=60*60*1000, progress_callback=None):
+        """
+        Spread local_files across several Sarvam batch jobs of at most files_per_job files each and run
+        up to max_concurrent_jobs of them at once. This is an async generator that yields each job's
+        result dict (see transcribe_batch, plus the written "transcripts") as soon as that job finishes.
+        """
+        logger.info(f"Called transcribe_many with {len(local_files)} files, files_per_job: {files_per_job}, max_concurrent_jobs: {max_concurrent_jobs}")
+        os.makedirs(destination_dir, exist_ok=True)
+        batches = [local_files[i:i + files_per_job] for i in range(0, len(local_files), files_per_job)]
+        semaphore = asyncio.Semaphore(max_concurrent_jobs)
+
+        async def run_job(index, batch):
+            async with semaphore:
+                job_callback = None
+                if progress_callback:
+                    job = f"{index + 1}/{len(batches)}"
+                    def job_callback(status):
+                        # ProgressEvents keep their numbers for the caller; only plain strings get the prefix
+                        if isinstance(status, ProgressEvent):
+                            progress_callback(status._replace(job=job))
+                        else:
+                            progress_callback(f"[job {job}] {status}")
+                logger.info(f"Starting batch {index + 1}/{len(batches)} with {len(batch)} files")
+                return await self.transcribe_batch_isolated(batch, destination_dir, chunk_duration_ms, job_callback)
+
+        tasks = [asyncio.create_task(run_job(index, batch)) for index, batch in enumerate(batches)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                logger.info(f"Batch job {result['job_id']} finished with state {result['job_state']}")
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
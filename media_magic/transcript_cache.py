@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from .audio_utils import get_cache_dir
+from .ffmpeg import iter_ffmpeg_output
+from .logger import logger
+
+
+class TranscriptCache:
+    """
+    Local content-addressed cache of transcript results.
+    Results are keyed by a hash of the audio decoded to normalized PCM (16 kHz mono 16-bit) plus the language code,
+    so the same audio hits the cache whatever file it came from. Source files additionally get an entry keyed by
+    their raw bytes (see source_key) naming the cached results of the files uploaded for them. Each result is one JSON file; a hit refreshes
+    the file's mtime and the least recently used files are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=200*1024*1024):
+        self.cache_dir = cache_dir or get_cache_dir("transcripts")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def audio_key(self, audio_path, language_code):
+        """Return the cache key of audio_path transcribed in language_code."""
+        digest = hashlib.sha256()
+        digest.update(f"{language_code}\n".encode("utf-8"))
+        for block in iter_ffmpeg_output([
+            "-loglevel", "error",
+            "-i", audio_path,
+            "-map", "0:a:0", "-vn",
+            "-ac", "1", "-ar", "16000",
+            "-f", "s16le", "-",
+        ]):
+            digest.update(block)
+        return digest.hexdigest()
+
+    def source_key(self, path, language_code, settings=""):
+        """
+        Return the cache key of the file at path as it is prepared with settings and transcribed in language_code.
+        Only the raw bytes are hashed, without decoding, so a source can be looked up before it is prepared.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"source\n{language_code}\n{settings}\n".encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        logger.info(f"Transcript cache hit: {key}")
+        return result
+
+    def put(self, key, result):
+        """Store result under key and evict the least recently used results if the cache is over max_bytes."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        logger.info(f"Stored transcript in cache: {key}")
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, _, size in self._entries())
+            else:
+                self._total_bytes += len(data) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.info(f"Evicted cached transcript: {os.path.basename(path)}")
+            except OSError as e:
+                logger.warning(f"Failed to evict cached transcript {path}: {e}")
+        self._total_bytes = total
@@ -0,0 +1,28 @@
+import os
+from .logger import logger
+
+
+def best_audio_stream(yt):
+    """Return the highest bitrate audio-only stream of yt, preferring MP4 (AAC) over WebM (Opus)."""
+    return yt.streams.get_audio_only() or yt.streams.get_audio_only(subtype='webm')
+
+
+def download_audio(url, output_dir, client='TV'):
+    """
+    Download only the best audio stream of the YouTube video at url into output_dir, as-is (no re-encode).
+    Returns the path of the downloaded .m4a (or .webm) file.
+    """
+    from pytubefix import YouTube
+    logger.info(f"Trying to connect to {url}")
+    yt = YouTube(url, client)
+    stream = best_audio_stream(yt)
+    if not stream:
+        raise Exception('No suitable audio stream found.')
+    ext = '.m4a' if stream.subtype == 'mp4' else f'.{stream.subtype}'
+    filename = os.path.splitext(stream.default_filename)[0] + ext
+    logger.info(f"Downloading audio stream ({stream.abr}, {stream.mime_type}) of {url}")
+    audio_path = stream.download(output_path=output_dir, filename=filename)
+    if not audio_path or not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
+        raise Exception('Downloaded audio file is missing or empty.')
+    logger.info(f"[Downloaded] {audio_path}")
+    return audio_path
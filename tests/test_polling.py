@@ -0,0 +1,21 @@
+import asyncio
+from media_magic.polling import JobStatusPoller
+
+
+def test_failing_status_callback_does_not_stop_other_jobs(tmp_path):
+    polls = {}
+
+    async def check_status(job_id):
+        polls[job_id] = polls.get(job_id, 0) + 1
+        return {"job_state": "Completed" if polls[job_id] >= 2 else "Running"}
+
+    def broken(state):
+        raise RuntimeError("callback bug")
+
+    async def run():
+        poller = JobStatusPoller(check_status, min_interval=0.01, base_processing_s=0.0, min_request_spacing=0.0,
+                                 speed_ratio=0.0, state_path=str(tmp_path / "poller_state.json"))
+        return await asyncio.wait_for(asyncio.gather(poller.wait("broken", on_status=broken), poller.wait("other")), timeout=5)
+
+    broken_status, other_status = asyncio.run(run())
+    assert broken_status["job_state"] == other_status["job_state"] == "Completed"
@@ -0,0 +1,38 @@
+import json
+from media_magic.merge import TranscriptWriter
+from media_magic.search import TranscriptIndex
+from media_magic.transcriber import SarvamBatchTranscriber
+
+
+def _stage_run(directory, text, start):
+    """Write the transcripts of one run of talk.wav into directory, as _finish_batch does in the staging dir."""
+    directory.mkdir()
+    writer = TranscriptWriter(str(directory), "talk")
+    writer.write_result({"transcript": text, "timestamps": {"words": text.split(), "start_time_seconds": [start, start + 1],
+                                                             "end_time_seconds": [start + 1, start + 2]}}, source="talk_chunk_1")
+    return writer.close()
+
+
+def test_publishing_twice_keeps_earlier_runs_searchable(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEDIA_MAGIC_CACHE_DIR", str(tmp_path / "cache"))
+    publish_dir = tmp_path / "transcripts"
+    publish_dir.mkdir()
+    # A TXT from before transcripts had a JSONL next to them
+    (publish_dir / "talk.txt").write_text("legacy words\n", encoding="utf-8")
+    transcriber = SarvamBatchTranscriber("key")
+    transcriber._publish_transcripts(_stage_run(tmp_path / "run1", "first run", 0), str(publish_dir))
+    transcriber._publish_transcripts(_stage_run(tmp_path / "run2", "second run", 5), str(publish_dir))
+
+    assert (publish_dir / "talk.txt").read_text(encoding="utf-8").splitlines() == ["legacy words", "first run", "second run"]
+    segments = [json.loads(line) for line in (publish_dir / "talk.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [segment["text"] for segment in segments] == ["legacy words", "first", "run", "second", "run"]
+    # SRT and VTT cues are timed for one run, so the latest run replaces them
+    assert "first" not in (publish_dir / "talk.srt").read_text(encoding="utf-8")
+
+    index = TranscriptIndex(str(tmp_path / "index.db"))
+    try:
+        index.update(str(publish_dir))
+        for query in ("legacy words", "first", "second"):
+            assert [hit.path for hit in index.search(query)] == [str(publish_dir / "talk.jsonl")]
+    finally:
+        index.close()
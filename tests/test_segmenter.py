@@ -0,0 +1,35 @@
+import wave
+import numpy as np
+import pytest
+from media_magic.ffmpeg import run_ffmpeg
+from media_magic.probe import probe_audio
+from media_magic.segmenter import segment_audio
+
+
+def _write_wav(path, seconds, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2").tobytes())
+
+
+@pytest.mark.parametrize("source_ext, profile", [(".wav", "flac"), (".flac", "flac"), (".flac", None)])
+def test_flac_chunks_have_their_own_duration_in_the_header(tmp_path, monkeypatch, source_ext, profile):
+    monkeypatch.setenv("MEDIA_MAGIC_CACHE_DIR", str(tmp_path / "cache"))
+    source = tmp_path / "talk.wav"
+    _write_wav(source, 130)
+    if source_ext == ".flac":
+        run_ffmpeg(["-loglevel", "error", "-i", str(source), "-c:a", "flac", str(tmp_path / "talk.flac")])
+        source = tmp_path / "talk.flac"
+    output_dir = tmp_path / "chunks"
+    output_dir.mkdir()
+
+    chunks = segment_audio(str(source), 40, str(output_dir), profile=profile)
+
+    assert [chunk.path.endswith(".flac") for chunk in chunks] == [True] * 4
+    assert sorted(p.suffix for p in output_dir.iterdir()) == [".flac"] * 4
+    for chunk, expected in zip(chunks, (40, 40, 40, 10)):
+        assert chunk.end - chunk.start == pytest.approx(expected, abs=0.05)
+        assert probe_audio(chunk.path)["duration"] == pytest.approx(chunk.end - chunk.start, abs=0.05)
@@ -0,0 +1,37 @@
+import wave
+import numpy as np
+from media_magic import silence
+
+SAMPLE_RATE = 16000
+
+
+def _read_wav(path):
+    with wave.open(path, "rb") as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+
+def test_streamed_chunks_hold_exactly_the_planned_source_samples(tmp_path, monkeypatch):
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2")
+    gap = np.zeros(2 * SAMPLE_RATE, dtype="<i2")
+    source = np.concatenate([tone, gap, tone, gap, tone])
+    path = str(tmp_path / "talk.wav")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(source.tobytes())
+    # Small decode blocks, so chunks and silences straddle block boundaries
+    iter_pcm = silence.iter_pcm
+    monkeypatch.setattr(silence, "iter_pcm", lambda audio_path, sample_rate: iter_pcm(audio_path, sample_rate, block_samples=999))
+    output_dir = tmp_path / "chunks"
+    output_dir.mkdir()
+
+    chunks = silence.split_on_silence(path, 6, str(output_dir), strip_silence=True)
+
+    # The cuts land in the gaps, which are stripped down to 0.2 s of padding on each side
+    assert [(round(chunk.start, 1), round(chunk.end, 1)) for chunk in chunks] == [(0.0, 3.2), (4.8, 8.2), (9.8, 13.0)]
+    for chunk in chunks:
+        spans = [(source_time, source_time + length) for _, source_time, length in chunk.offsets] or [(chunk.start, chunk.end)]
+        expected = np.concatenate([source[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] for start, end in spans])
+        assert np.array_equal(_read_wav(chunk.path), expected)
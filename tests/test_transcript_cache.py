@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import os
+import sys
+from media_magic.polling import JobStatusPoller
+from media_magic.transcriber import SarvamBatchTranscriber
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from fake_sarvam import start_fakes  # noqa: E402
+from transcriber_throughput import write_fixture  # noqa: E402
+
+
+def test_cached_source_is_neither_prepared_nor_sent_again(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEDIA_MAGIC_CACHE_DIR", str(tmp_path / "cache"))
+    logging.getLogger("azure").setLevel(logging.WARNING)
+    source = str(tmp_path / "talk.wav")
+    write_fixture(source, 90, seed=1)
+    prepared = []
+
+    async def run():
+        storage, api, runners = await start_fakes()
+        try:
+            results = []
+            for _ in range(2):
+                api.requests = 0
+                transcriber = SarvamBatchTranscriber("key", api_base_url=api.url, upload_profile="opus")
+                transcriber.poller = JobStatusPoller(transcriber.check_job_status, min_interval=0.1, base_processing_s=0.5)
+                prepare = transcriber._prepare_upload_files
+                monkeypatch.setattr(transcriber, "_prepare_upload_files",
+                                    lambda local_files, *args: prepared.append(list(local_files)) or prepare(local_files, *args))
+                async with transcriber:
+                    result = await transcriber.transcribe_batch([source], str(tmp_path / "out"), chunk_duration_ms=40000)
+                results.append((result, api.requests))
+            return results
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+    (first, first_requests), (second, second_requests) = asyncio.run(run())
+    assert first["job_state"] == second["job_state"] == "Completed"
+    assert first_requests > 0 and second["job_id"] is None and second_requests == 0
+    assert prepared == [[os.path.abspath(source)], []]
+    srt = [path for path in second["transcripts"] if path.endswith(".srt")]
+    assert srt and "00:00:4" in open(srt[0], encoding="utf-8").read()
@@ -1,16 +1,37 @@
 import os
 import time
+import random
+import asyncio
 import argparse
 import logging
-import requests
+import mimetypes
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from pytubefix import YouTube
-from moviepy import editor
+from media_magic.ffmpeg import run_ffmpeg
+from media_magic.probe import get_audio_info
+from media_magic.silence import split_on_silence
+from media_magic.youtube import download_audio
+from media_magic.search import index_transcripts
+from media_magic.ratelimit import TokenBucket, retry_after_seconds
+from media_magic.transcript_cache import TranscriptCache
 
 FORMAT_CONS = '%(asctime)s %(name)-12s %(levelname)8s\t%(message)s'
 logging.basicConfig(level=logging.INFO, format=FORMAT_CONS)
 logger = logging.getLogger(__name__)
 
+LANGUAGE_CODE = "gu-IN"
+SARVAM_STT_URL = "https://api.sarvam.ai/speech-to-text"
+
+# Audio codecs that convert_to_audio copies out of the video as-is, mapped to the extension of the output
+DEMUX_EXTENSIONS = {
+  "aac": ".m4a",
+  "mp3": ".mp3",
+  "opus": ".ogg",
+  "vorbis": ".ogg",
+}
+
 
 def create_if_not_exists(directory):
   if not os.path.isdir(directory):
@@ -18,116 +39,311 @@ def create_if_not_exists(directory):
     logger.info(f"{directory} was absent. Created the missing directory.")
 
 
-def download_videos(file, video_dir):
-  logger.info(f"Downloading videos from {file} to {video_dir}")
-  create_if_not_exists(video_dir)
-  downloaded_files = []
-  for url in file:
-    url = url.strip('\n')
-    if not url:
-      continue
+def __download_one(url, video_dir, audio_only):
+  if audio_only:
+    return download_audio(url, video_dir)
+  logger.info(f"Trying to connect to {url}")
+  yt = YouTube(url, 'TV')
+  logger.info(f"[{url}] Successfully connected")
+  stream = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
+  if not stream:
+    raise Exception('No suitable video stream found.')
+  logger.info(f"[{url}] Starting download")
+  out_file = stream.download(video_dir)
+  logger.info(f"[Downloaded] {stream.title}")
+  return out_file
 
+
+def __download_with_retries(url, video_dir, audio_only, retries, backoff):
+  for attempt in range(retries + 1):
     try:
-      logger.info(f"Trying to connect to {url}")
-      yt = YouTube(url, 'TV')
-    except Exception as error:
-      logger.error(f"[{url}] Connection Error: {error}")
-      continue
-
-    logger.info("Successfully connected")
-    streams = yt.streams
-    logger.info("Found streams")
-    stream = streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
-    logger.info("Starting download")
-    try:
-      out_file = stream.download(video_dir)
-      logger.info(f"[Downloaded] {stream.title}")
-      downloaded_files.append(os.path.basename(out_file))
+      return __download_one(url, video_dir, audio_only)
     except Exception as error:
-      logger.error(f"[{url}] Download Error: {error}")
+      if attempt == retries:
+        logger.error(f"[{url}] Download Error: {error}")
+        return None
+      delay = backoff * 2 ** attempt
+      logger.warning(f"[{url}] Download attempt {attempt + 1} failed: {error}; retrying in {delay:.1f}s")
+      time.sleep(delay)
+
+
+def download_videos(file, video_dir, audio_only=False, workers=4, retries=2, backoff=2.0):
+  """
+  Download every url in file into video_dir with up to workers downloads at once and return the
+  downloaded file names, in the order of the urls. Failed urls are retried retries times with an
+  exponential backoff starting at backoff seconds, then skipped.
+  With audio_only, only the best audio stream is fetched (as .m4a/.webm), ready for transcription as-is.
+  """
+  logger.info(f"Downloading {'audio' if audio_only else 'videos'} from {file} to {video_dir} with {workers} workers")
+  create_if_not_exists(video_dir)
+  urls = [url.strip() for url in file if url.strip()]
+  started = time.monotonic()
+  with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+    out_files = list(pool.map(lambda url: __download_with_retries(url, video_dir, audio_only, retries, backoff), urls))
+  elapsed = time.monotonic() - started
+  downloaded_files = [os.path.basename(out_file) for out_file in out_files if out_file]
+  total_bytes = sum(os.path.getsize(out_file) for out_file in out_files if out_file and os.path.exists(out_file))
+  logger.info(f"Downloaded {len(downloaded_files)}/{len(urls)} files, {total_bytes / 1024 / 1024:.1f} MB in {elapsed:.1f}s "
+              f"({total_bytes / 1024 / 1024 / max(elapsed, 1e-6):.2f} MB/s, {len(downloaded_files) / max(elapsed, 1e-6):.2f} files/s)")
   return downloaded_files
 
-def __transcribe_audio_by_sarvam(file_path):
-  logger.info(f"Calling Sarvam API for {file_path}")
-  headers = {
-    "api-subscription-key": os.getenv("SARVAM_API_KEY"),
-  }
-  files = {
-    "file": (file_path, open(file_path, 'rb'), "audio/mpeg")
-  }
+async def __transcribe_audio_by_sarvam(session, bucket, file_path, max_retries=5, backoff=1.0):
+  """
+  Send file_path to the Sarvam speech-to-text API, waiting on bucket before every attempt.
+  429 and 5xx responses and connection errors are retried up to max_retries times with exponential
+  backoff, honouring Retry-After; returns the response JSON, or None once the retries are exhausted.
+  """
+  with open(file_path, 'rb') as f:
+    audio = f.read()
+  content_type = mimetypes.guess_type(file_path)[0] or "audio/wav"
+  for attempt in range(max_retries + 1):
+    form = aiohttp.FormData()
+    form.add_field("file", audio, filename=os.path.basename(file_path), content_type=content_type)
+    form.add_field("language_code", LANGUAGE_CODE)
+    await bucket.acquire()
+    logger.info(f"Calling Sarvam API for {file_path}")
+    retry_after = None
+    try:
+      async with session.post(SARVAM_STT_URL, headers={"api-subscription-key": os.getenv("SARVAM_API_KEY", "")}, data=form) as response:
+        if response.status == 200:
+          return await response.json()
+        body = await response.text()
+        if response.status != 429 and response.status < 500:
+          logger.error(f"[{file_path}] Transcribe Error: {response.status} | Response: {body}")
+          return None
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        if response.status == 429 and retry_after is not None:
+          bucket.pause(retry_after)
+        error = f"{response.status} | Response: {body}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+      error = repr(e)
+    if attempt == max_retries:
+      logger.error(f"[{file_path}] Transcribe Error after {attempt + 1} attempts: {error}")
+      return None
+    delay = max(retry_after or 0, backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+    logger.warning(f"[{file_path}] Transcribe attempt {attempt + 1} failed: {error}; retrying in {delay:.1f}s")
+    await asyncio.sleep(delay)
 
-  try:
-    response = requests.post(
-      "https://api.sarvam.ai/speech-to-text",
-      headers=headers,
-      files=files,
-      data={"language_code": "gu-IN"}
-    )
-    response.raise_for_status()
-    return response.json()
-  except Exception as error:
-    if hasattr(error, 'response') and error.response is not None:
-      logger.error(f"[{file_path}] Transcribe Error: {error} | Response: {error.response.text}")
-    else:
-      logger.error(f"[{file_path}] Transcribe Error: {error}")
-    return None
 
-def transcribe(audio_files):
+async def __transcribe_chunk(session, bucket, cache, chunk_path):
+  cache_key = await asyncio.to_thread(cache.audio_key, chunk_path, LANGUAGE_CODE)
+  result = cache.get(cache_key)
+  if result and 'transcript' in result:
+    return result['transcript']
+  result = await __transcribe_audio_by_sarvam(session, bucket, chunk_path)
+  if result and 'transcript' in result:
+    cache.put(cache_key, result)
+    return result['transcript']
+  logger.error(f"[{chunk_path}] Transcribe Error: {result}")
+  return None
+
+
+async def transcribe_file(session, bucket, cache, audio_file, strip_silence=False, max_concurrency=16, upload_profile="flac"):
+  """
+  Split audio_file into chunks of at most 25s, cutting in silences where possible and encoding them with
+  upload_profile (see media_magic.segmenter.UPLOAD_PROFILES, None for 16 kHz WAV), transcribe the chunks
+  concurrently (at most max_concurrency requests in flight, paced by bucket) and write the transcript,
+  in chunk order, to transcripts/{base_name}.txt. Returns the transcript path.
+  """
+  base_name = os.path.splitext(os.path.basename(audio_file))[0]
+  breakdown_dir = os.path.join('audio-breakdowns', base_name)
+  create_if_not_exists(breakdown_dir)
+
+  chunks = await asyncio.to_thread(split_on_silence, audio_file, 25, breakdown_dir, base=base_name, strip_silence=strip_silence,
+                                   profile=upload_profile)
+  chunk_bytes = sum(os.path.getsize(chunk.path) for chunk in chunks)
+  logger.info(f"Prepared {chunk_bytes / 1024 / 1024:.2f} MB of chunks from {os.path.getsize(audio_file) / 1024 / 1024:.2f} MB "
+              f"of {audio_file} (profile: {upload_profile or 'wav'})")
+
+  semaphore = asyncio.Semaphore(max_concurrency)
+  async def transcribe_chunk(chunk_path):
+    async with semaphore:
+      return await __transcribe_chunk(session, bucket, cache, chunk_path)
+  started = time.monotonic()
+  transcript = await asyncio.gather(*(transcribe_chunk(chunk.path) for chunk in chunks))
+  failed = sum(1 for text in transcript if text is None)
+  logger.info(f"Transcribed {len(chunks) - failed}/{len(chunks)} chunks of {audio_file} in {time.monotonic() - started:.1f}s")
+
+  # Merge all data into a txt file
+  transcript_path = os.path.join('transcripts', f"{base_name}.txt")
+  with open(transcript_path, 'w', encoding='utf-8') as f:
+    f.write('\n'.join(text for text in transcript if text is not None))
+  await asyncio.to_thread(index_transcripts, [transcript_path])
+  return transcript_path
+
+
+async def transcribe_async(audio_files, strip_silence=False, requests_per_second=5.0, max_concurrency=16, upload_profile="flac"):
+  cache = TranscriptCache()
   create_if_not_exists('transcripts')
   create_if_not_exists('guj-transcripts')
   create_if_not_exists('audio-breakdowns')
 
-  for audio_file in audio_files:
-    base_name = os.path.splitext(os.path.basename(audio_file))[0]
-    breakdown_dir = os.path.join('audio-breakdowns', base_name)
-    create_if_not_exists(breakdown_dir)
-
-    # Split audio into 25s chunks
-    audio = editor.AudioFileClip(audio_file)
-    duration = int(audio.duration)
-    chunk_paths = []
-    for i in range(0, duration, 25):
-      chunk = audio.subclip(i, min(i + 25, duration))
-      chunk_path = os.path.join(breakdown_dir, f"chunk_{i//25 + 1}.mp3")
-      chunk.write_audiofile(chunk_path, logger=None)
-      chunk_paths.append(chunk_path)
-
-    # Transcribe each chunk and collect results
-    transcript = []
-    for chunk_path in chunk_paths:
-      result = __transcribe_audio_by_sarvam(chunk_path)
-      if result and 'transcript' in result:
-        transcript.append(result['transcript'])
-      else:
-        logger.error(f"[{chunk_path}] Transcribe Error: {result}")
-        logger.info("sleeping for 5 seconds") # generally is 429 errors.
-        time.sleep(5)
-        result = __transcribe_audio_by_sarvam(chunk_path)
-        if result and 'transcript' in result:
-          logger.info("transcribe success on retry")
-          transcript.append(result['transcript'])
-        else:
-          logger.error(f"[{chunk_path}] Transcribe Error: {result}")
-
-    # Merge all data into a txt file
-    transcript_path = os.path.join('transcripts', f"{base_name}.txt")
-    with open(transcript_path, 'w', encoding='utf-8') as f:
-      f.write('\n'.join(transcript))
-
-
-def convert_to_audio(video_dir, audio_dir, video_files=None):
+  bucket = TokenBucket(requests_per_second)
+  timeout = aiohttp.ClientTimeout(total=120, connect=10)
+  async with aiohttp.ClientSession(timeout=timeout) as session:
+    for audio_file in audio_files:
+      await transcribe_file(session, bucket, cache, audio_file, strip_silence, max_concurrency, upload_profile)
+
+
+def transcribe(audio_files, strip_silence=False, requests_per_second=5.0, max_concurrency=16, upload_profile="flac"):
+  """Transcribe audio_files chunk by chunk, sending up to requests_per_second chunk requests per second."""
+  asyncio.run(transcribe_async(audio_files, strip_silence, requests_per_second, max_concurrency, upload_profile))
+
+
+def __audio_output(video_path, audio_dir):
+  """Return (output path, ffmpeg codec args) for the audio of video_path: the track as-is when it can be demuxed, else MP3."""
+  stem = os.path.splitext(os.path.basename(video_path))[0]
+  codec = get_audio_info(video_path)["codec"]
+  if codec in DEMUX_EXTENSIONS:
+    return os.path.join(audio_dir, f"{stem}{DEMUX_EXTENSIONS[codec]}"), ["-c:a", "copy"]
+  return os.path.join(audio_dir, f"{stem}.mp3"), ["-c:a", "libmp3lame", "-q:a", "2"]
+
+
+def __convert_video(video_path, audio_dir):
+  """
+  Extract the audio of video_path into audio_dir unless an output newer than the video is already there,
+  either the demuxed track or the MP3 written when demuxing it failed.
+  """
+  out_path, codec_args = __audio_output(video_path, audio_dir)
+  root, ext = os.path.splitext(out_path)
+  for existing in dict.fromkeys([out_path, f"{root}.mp3"]):
+    if os.path.exists(existing) and os.path.getmtime(existing) >= os.path.getmtime(video_path):
+      logger.info(f"[Skipped] {existing} is up to date")
+      return existing, False
+  # Write next to the output and rename, so an interrupted run never leaves a partial file that looks up to date
+  tmp_path = f"{root}.part{ext}"
+  try:
+    try:
+      run_ffmpeg(["-loglevel", "error", "-y", "-i", video_path, "-map", "0:a:0", "-vn", *codec_args, tmp_path])
+    except RuntimeError as error:
+      if codec_args[1] != "copy":
+        raise
+      logger.warning(f"[{video_path}] Demuxing the audio failed ({error}); encoding to MP3 instead")
+      out_path = f"{root}.mp3"
+      tmp_path = f"{root}.part.mp3"
+      run_ffmpeg(["-loglevel", "error", "-y", "-i", video_path, "-map", "0:a:0", "-vn",
+                  "-c:a", "libmp3lame", "-q:a", "2", tmp_path])
+    os.replace(tmp_path, out_path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+  logger.info(f"[Converted] {video_path} -> {out_path}")
+  return out_path, True
+
+
+def convert_to_audio(video_dir, audio_dir, video_files=None, workers=None):
+  """
+  Extract the audio of the videos in video_dir (or just video_files) into audio_dir with a pool of
+  up to workers processes (defaults to the CPU count). The audio track is copied as-is when its codec
+  allows it (AAC to .m4a, MP3, Opus/Vorbis to .ogg), otherwise it is encoded to MP3. Videos whose audio
+  output is already newer than the video are skipped. Returns the output file names in input order.
+  """
   logger.info(f"Converting videos from {video_dir} to {audio_dir} {'with' if video_files is not None else ''}")
 
   create_if_not_exists(audio_dir)
 
   if video_files is None:
-    videos = os.listdir(video_dir)
+    videos = sorted(f for f in os.listdir(video_dir) if os.path.isfile(os.path.join(video_dir, f)))
   else:
     videos = video_files
+  video_paths = [os.path.join(video_dir, video) for video in videos]
+
+  workers = max(1, min(workers or os.cpu_count() or 1, len(video_paths) or 1))
+  results = []
+  if workers == 1:
+    for video_path in video_paths:
+      try:
+        results.append(__convert_video(video_path, audio_dir))
+      except Exception as error:
+        logger.error(f"[{video_path}] Convert Error: {error}")
+        results.append((None, False))
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [pool.submit(__convert_video, video_path, audio_dir) for video_path in video_paths]
+      for video_path, future in zip(video_paths, futures):
+        try:
+          results.append(future.result())
+        except Exception as error:
+          logger.error(f"[{video_path}] Convert Error: {error}")
+          results.append((None, False))
+  converted = sum(1 for _, did_convert in results if did_convert)
+  skipped = sum(1 for out_path, did_convert in results if out_path and not did_convert)
+  logger.info(f"Converted {converted}, skipped {skipped} up-to-date, failed {len(results) - converted - skipped} of {len(results)} videos")
+  return [os.path.basename(out_path) for out_path, _ in results if out_path]
+
 
-  for video in videos:
-    source = editor.VideoFileClip(f"{video_dir}/{video}")
-    source.audio.write_audiofile(f"{audio_dir}/{''.join(video.split('.')[:-1])}.mp3")
+async def __pipeline_stage(inbox, outbox, workers, handle, downstream_workers):
+  """Run workers copies of handle over the items of inbox, passing results on to outbox, then end the next stage."""
+  async def worker():
+    while True:
+      item = await inbox.get()
+      if item is None:
+        return
+      try:
+        result = await handle(item)
+      except Exception as error:
+        logger.error(f"[{item}] Pipeline Error: {error}")
+        continue
+      if result is not None and outbox is not None:
+        await outbox.put(result)
+  await asyncio.gather(*(worker() for _ in range(workers)))
+  if outbox is not None:
+    for _ in range(downstream_workers):
+      await outbox.put(None)
+
+
+async def run_pipeline(urls, video_dir, audio_dir, audio_only=False, download_workers=4, convert_workers=None,
+                       transcribe_workers=2, queue_size=8, download_retries=2, strip_silence=False,
+                       requests_per_second=5.0, max_concurrency=16, upload_profile="flac"):
+  """
+  Download, convert and transcribe urls as a pipeline: every finished download goes straight to conversion
+  and every converted file straight to transcription, through queues of at most queue_size items so a fast
+  stage cannot run far ahead of a slow one. Each stage runs its own number of workers; with audio_only the
+  downloaded audio skips conversion. Returns the transcript paths in completion order.
+  """
+  create_if_not_exists(audio_dir)
+  if not audio_only:
+    create_if_not_exists(video_dir)
+  create_if_not_exists('transcripts')
+  create_if_not_exists('audio-breakdowns')
+  convert_workers = convert_workers or os.cpu_count() or 1
+  loop = asyncio.get_running_loop()
+
+  url_queue = asyncio.Queue()
+  convert_queue = asyncio.Queue(maxsize=queue_size)
+  transcribe_queue = asyncio.Queue(maxsize=queue_size)
+  for url in urls:
+    url_queue.put_nowait(url)
+  for _ in range(download_workers):
+    url_queue.put_nowait(None)
+
+  cache = TranscriptCache()
+  bucket = TokenBucket(requests_per_second)
+  transcripts = []
+  timeout = aiohttp.ClientTimeout(total=120, connect=10)
+  started = time.monotonic()
+  with ThreadPoolExecutor(max_workers=download_workers) as download_pool, \
+       ProcessPoolExecutor(max_workers=convert_workers) as convert_pool:
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+      async def download(url):
+        return await loop.run_in_executor(download_pool, __download_with_retries, url,
+                                          audio_dir if audio_only else video_dir, audio_only, download_retries, 2.0)
+
+      async def convert(video_path):
+        out_path, _ = await loop.run_in_executor(convert_pool, __convert_video, video_path, audio_dir)
+        return out_path
+
+      async def transcribe_one(audio_file):
+        transcripts.append(await transcribe_file(session, bucket, cache, audio_file, strip_silence, max_concurrency, upload_profile))
+
+      stages = [__pipeline_stage(url_queue, transcribe_queue if audio_only else convert_queue, download_workers, download,
+                                 transcribe_workers if audio_only else convert_workers)]
+      if not audio_only:
+        stages.append(__pipeline_stage(convert_queue, transcribe_queue, convert_workers, convert, transcribe_workers))
+      stages.append(__pipeline_stage(transcribe_queue, None, transcribe_workers, transcribe_one, 0))
+      await asyncio.gather(*stages)
+  logger.info(f"Pipeline finished {len(transcripts)}/{len(urls)} transcripts in {time.monotonic() - started:.1f}s")
+  return transcripts
 
 
 if __name__ == '__main__':
@@ -155,32 +371,113 @@ if __name__ == '__main__':
                     type=str,
                     help='Specify the directory where the audios are to be downloaded')
 
+  parser.add_argument('--audio-only',
+                    action="store_true",
+                    help='With --download, fetch only the audio streams straight into --audio-dir (no video, no conversion)',
+                    default=False)
+
+  parser.add_argument('--download-workers',
+                    type=int,
+                    help='Number of downloads to run at once',
+                    default=4)
+
+  parser.add_argument('--download-retries',
+                    type=int,
+                    help='Number of times a failed download is retried',
+                    default=2)
+
+  parser.add_argument('--convert-workers',
+                    type=int,
+                    help='Number of videos to convert at once (defaults to the CPU count)',
+                    default=None)
+
   parser.add_argument('--transcribe', '-t',
                     action="store_true",
                     help='Use this to transcribe audio files in --audio-dir',
                     default=False)
 
+  parser.add_argument('--strip-silence',
+                    action="store_true",
+                    help='Drop long silences from the audio before it is sent for transcription',
+                    default=False)
+
+  parser.add_argument('--requests-per-second',
+                    type=float,
+                    help='Maximum number of transcription requests sent per second',
+                    default=5.0)
+
+  parser.add_argument('--max-concurrency',
+                    type=int,
+                    help='Maximum number of transcription requests in flight at once',
+                    default=16)
+
+  parser.add_argument('--pipeline', '-p',
+                    action="store_true",
+                    help='Download, convert and transcribe the --file urls as one pipeline, each file moving on as soon as its stage is done',
+                    default=False)
+
+  parser.add_argument('--transcribe-workers',
+                    type=int,
+                    help='Number of files transcribed at once in --pipeline mode',
+                    default=2)
+
+  parser.add_argument('--queue-size',
+                    type=int,
+                    help='Maximum number of files waiting between two --pipeline stages',
+                    default=8)
+
+  parser.add_argument('--upload-profile',
+                    choices=['flac', 'opus', 'wav'],
+                    help='Encoding of the chunks sent for transcription (16 kHz mono)',
+                    default='flac')
+
   args = parser.parse_args()
+  upload_profile = None if args.upload_profile == 'wav' else args.upload_profile
+  if args.pipeline:
+    if not args.file:
+      logger.error("Missing --file parameter")
+      exit(1)
+    if not args.audio_dir or (not args.audio_only and not args.video_dir):
+      logger.error("Missing --audio-dir or --video-dir parameter")
+      exit(1)
+    urls = [url.strip() for url in args.file if url.strip()]
+    asyncio.run(run_pipeline(urls, args.video_dir, args.audio_dir, audio_only=args.audio_only,
+                             download_workers=args.download_workers, convert_workers=args.convert_workers,
+                             transcribe_workers=args.transcribe_workers, queue_size=args.queue_size,
+                             download_retries=args.download_retries, strip_silence=args.strip_silence,
+                             requests_per_second=args.requests_per_second, max_concurrency=args.max_concurrency,
+                             upload_profile=upload_profile))
+    exit(0)
   downloaded_files = None
   if args.download:
     if not args.file:
       logger.error("Missing --file parameter")
       exit(1)
-    downloaded_files = download_videos(args.file, args.video_dir)
-  if args.convert:
+    if args.audio_only:
+      if not args.audio_dir:
+        logger.error("Missing --audio-dir parameter")
+        exit(1)
+      downloaded_files = download_videos(args.file, args.audio_dir, audio_only=True,
+                                         workers=args.download_workers, retries=args.download_retries)
+    else:
+      downloaded_files = download_videos(args.file, args.video_dir,
+                                         workers=args.download_workers, retries=args.download_retries)
+  if args.convert and not args.audio_only:
     if not args.audio_dir:
       logger.error("Missing --audio-dir parameter")
       exit(1)
     if downloaded_files is not None:
-      convert_to_audio(args.video_dir, args.audio_dir, downloaded_files)
+      convert_to_audio(args.video_dir, args.audio_dir, downloaded_files, workers=args.convert_workers)
     else:
-      convert_to_audio(args.video_dir, args.audio_dir)
+      convert_to_audio(args.video_dir, args.audio_dir, workers=args.convert_workers)
   if args.transcribe:
     if not args.audio_dir:
       logger.error("Missing --audio-dir parameter")
       exit(1)
-    audio_files = [os.path.join(args.audio_dir, f) for f in os.listdir(args.audio_dir) if f.endswith('.mp3') or f.endswith('.m4a')]
+    audio_files = [os.path.join(args.audio_dir, f) for f in os.listdir(args.audio_dir) if f.endswith(('.mp3', '.m4a', '.ogg', '.webm'))]
     if not audio_files:
       logger.error(f"No audio files found in {args.audio_dir}")
       exit(1)
-    transcribe(audio_files)
\ No newline at end of file
+    transcribe(audio_files, strip_silence=args.strip_silence,
+               requests_per_second=args.requests_per_second, max_concurrency=args.max_concurrency,
+               upload_profile=upload_profile)
\ No newline at end of file